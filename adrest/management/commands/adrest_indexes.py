@@ -0,0 +1,59 @@
+""" Find filters and sorting of resources which cannot use indexes. """
+from django.core.management.base import NoArgsCommand
+from django.core.urlresolvers import get_resolver
+
+from ...mixin.dynamic import DynamicMixin
+from ...utils.indexes import is_indexed
+
+
+class Command(NoArgsCommand):
+
+    """ Print unindexed filters and sorting of registered resources. """
+
+    help = "Print filters and sorting of ADRest resources which cannot " \
+        "be served by database indexes."
+
+    def handle_noargs(self, **options):
+        for resource in sorted(set(get_resources()), key=str):
+            model = resource._meta.model
+
+            filters = dict()
+            for _, lookup, exclude, _, path in resource._meta.filters.values():
+                if not exclude and not is_indexed(model, path, lookup):
+                    filters.setdefault(path, []).append(lookup)
+
+            sorting = [f.name for f in model._meta.fields
+                       if not is_indexed(model, f.name)]
+
+            if not filters and not sorting:
+                continue
+
+            self.stdout.write("%s (%s, index_policy=%s)" % (
+                resource._meta.url_name, model._meta,
+                resource._meta.index_policy))
+            for path, lookups in sorted(filters.items()):
+                self.stdout.write(
+                    "  filter: %s (%s)" % (path, ', '.join(sorted(lookups))))
+            if sorting:
+                self.stdout.write("  sort: %s" % ', '.join(sorting))
+
+
+def get_resources(patterns=None):
+    """ Find resources with models in URL's patterns.
+
+    :return generator: resource's classes
+
+    """
+    if patterns is None:
+        patterns = get_resolver(None).url_patterns
+
+    for pattern in patterns:
+        if hasattr(pattern, 'url_patterns'):
+            for resource in get_resources(pattern.url_patterns):
+                yield resource
+            continue
+
+        resource = getattr(pattern.callback, 'resource', None)
+        if resource and issubclass(resource, DynamicMixin) and \
+                resource._meta.model:
+            yield resource
@@ -0,0 +1,21 @@
+""" Build full-text search indexes of resources. """
+from django.core.management.base import NoArgsCommand
+
+from ...utils.search import INDEXES
+from .adrest_indexes import get_resources
+
+
+class Command(NoArgsCommand):
+
+    """ Rebuild full-text indexes of registered resources. """
+
+    help = "Rebuild full-text search indexes of ADRest resources."
+
+    def handle_noargs(self, **options):
+        # Import resources for register their indexes
+        list(get_resources())
+
+        for model, indexes in sorted(
+                INDEXES.items(), key=lambda i: str(i[0]._meta)):
+            for index in indexes:
+                self.stdout.write("%r: %s rows" % (index, index.rebuild()))
@@ -1,18 +1,41 @@
 """ Filters and sorting support. """
-from django.core.exceptions import FieldError
+from django.core.exceptions import FieldError, ValidationError
+from django.db.models import Avg, BooleanField, Count, Max, Min, Q, Sum
+from django.db.models.query import QuerySet
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.sql.constants import QUERY_TERMS
 from logging import getLogger
 
 from ..settings import ADREST_LIMIT_PER_PAGE
 from ..utils import UpdatedList
+from ..utils.cache import CountCache, DEFAULT_TIMEOUT
+from ..utils.exceptions import HttpError
+from ..utils.indexes import is_indexed
 from ..utils.meta import MixinBaseMeta, MixinBase
 from ..utils.paginator import Paginator
+from ..utils.search import get_index
+from ..utils.status import HTTP_400_BAD_REQUEST
+from ..utils.tools import as_tuple
 
 
-logger = getLogger('django.request')
+logger = getLogger('adrest')
 
 # Separator used to split filter strings apart.
 LOOKUP_SEP = '__'
 
+#: Functions for `adr-aggregate` param
+AGGREGATES = dict(count=Count, sum=Sum, avg=Avg, min=Min, max=Max)
+
+#: Policies for filters and sorting which cannot use database indexes
+INDEX_POLICIES = 'allow', 'warn', 'reject'
+
+#: Lookups which are allowed for filters by default
+DEFAULT_LOOKUPS = 'exact', 'in', 'gt', 'gte', 'lt', 'lte', 'isnull', \
+    'startswith'
+
+#: Lookups which values are converted by model's fields
+FIELD_LOOKUPS = 'exact', 'in', 'gt', 'gte', 'lt', 'lte'
+
 
 class Meta:
 
@@ -36,6 +59,63 @@ class Meta:
     #: it with `?max=...`
     limit_per_page = ADREST_LIMIT_PER_PAGE
 
+    #: Class of paginator. Use
+    #: :class:`adrest.utils.paginator.CursorPaginator` for keyset pagination
+    #: of big collections.
+    paginator = Paginator
+
+    #: Count collection for pagination (`count` and `num_pages`).
+    #: Set to `False` for load `limit_per_page + 1` resources instead of
+    #: `SELECT COUNT(*)`. Clients can disable counting with `?adr-count=0`.
+    paginate_count = True
+
+    #: Cache counts of collections. Set True for default cache's timeout or
+    #: a timeout in seconds. Counts are keyed by filters of collection and
+    #: are reset when the model's instances are saved or deleted.
+    #: See :class:`adrest.utils.cache.CountCache`.
+    paginate_count_cache = None
+
+    #: Fields (and lookups) which could be used for filtering by clients.
+    #: Filters with other lookups or fields return `400 Bad Request`.
+    #: By default all model's fields are allowed with `DEFAULT_LOOKUPS`,
+    #: other filters by model's fields are passed to the queryset as is
+    #: (invalid ones are logged and skipped).
+    #: ::
+    #:
+    #:     class SomeResource(DynamicMixin, View):
+    #:         class Meta:
+    #:             model = 'app.book'
+    #:             filter_fields = dict(
+    #:                 title=('exact', 'startswith', 'icontains'),
+    #:                 author__name=None,   # default lookups
+    #:             )
+    #:
+    #: ::
+    #:
+    #:     ?title__icontains=war&author__name=Leo&status__not=3
+    #:
+    filter_fields = None
+
+    #: Policy for filters and sorting which cannot be served by database
+    #: indexes (introspected once per model):
+    #:
+    #: * 'allow' -- do nothing;
+    #: * 'warn' -- log a warning;
+    #: * 'reject' -- return `400 Bad Request`.
+    #:
+    #: Run `manage.py adrest_indexes` for find unindexed filters.
+    index_policy = 'allow'
+
+    #: Model's fields for full-text search with `adr-q` param. Search is
+    #: served by an index (see :mod:`adrest.utils.search`) which is updated
+    #: when the model's instances are saved or deleted. Run
+    #: `manage.py adrest_search` for index existing instances.
+    #: ::
+    #:
+    #:     ?adr-q=treasure island
+    #:
+    search_fields = None
+
     #: Define queryset for resource's operation.
     #: By default: self.Meta.model.objects.all()
     queryset = None
@@ -55,6 +135,45 @@ class DynamicMixinMeta(MixinBaseMeta):
         if cls._meta.model and cls._meta.queryset is None:
             cls._meta.queryset = cls._meta.model.objects.all()
 
+        if cls._meta.index_policy not in INDEX_POLICIES:
+            raise AssertionError(
+                "Resource.Meta.index_policy should be one of: %s" %
+                ', '.join(INDEX_POLICIES))
+
+        # Compile filters
+        cls._meta.filters = dict()
+        if cls._meta.model:
+            filter_fields = cls._meta.filter_fields
+            if filter_fields is None:
+                filter_fields = cls._meta.fields
+            if not isinstance(filter_fields, dict):
+                filter_fields = dict((name, None) for name in filter_fields)
+
+            for path, lookups in filter_fields.items():
+                cls._meta.filters.update(get_filter_specs(
+                    cls._meta.model, path, lookups or DEFAULT_LOOKUPS))
+
+        if cls._meta.model and cls._meta.search_fields:
+            cls._meta.search_index = get_index(
+                cls._meta.model, as_tuple(cls._meta.search_fields))
+
+        if cls._meta.model and cls._meta.paginate_count_cache:
+            cls._meta.count_cache = CountCache(
+                cls._meta.model,
+                timeout=DEFAULT_TIMEOUT
+                if cls._meta.paginate_count_cache is True
+                else cls._meta.paginate_count_cache)
+
+        # Load serialized relations with the queryset (see EmitterMixin)
+        if cls._meta.queryset is not None and cls._meta.emit_relations:
+            select, prefetch = cls._meta.emit_relations
+            if select:
+                cls._meta.queryset = cls._meta.queryset.select_related(
+                    *select)
+            if prefetch:
+                cls._meta.queryset = cls._meta.queryset.prefetch_related(
+                    *prefetch)
+
         return cls
 
 
@@ -71,12 +190,19 @@ class DynamicMixin(MixinBase):
 
     Meta = Meta
 
+    #: Queryset of the instance (a copy of `Meta.queryset`)
+    queryset = None
+
     def __init__(self, *args, **kwargs):
-        """ Copy self queryset for prevent query caching. """
+        """ Copy the resource's queryset for prevent query caching.
+
+        `_meta` is shared by all of the resource's instances (and threads),
+        so the copy is stored on the instance.
+
+        """
         super(DynamicMixin, self).__init__(*args, **kwargs)
 
-        if self._meta.queryset is not None:
-            self._meta.queryset = self._meta.queryset.all()
+        self.queryset = self._meta.queryset
 
     def get_collection(self, request, **resources):
         """ Get filters and return filtered result.
@@ -84,29 +210,105 @@ class DynamicMixin(MixinBase):
         :return collection: collection of related resources.
 
         """
-        if self._meta.queryset is None:
+        if self.queryset is None:
             return []
 
         # Filter collection
         filters = self.get_filters(request, **resources)
         filters.update(self.get_default_filters(**resources))
-        qs = self._meta.queryset
-        for key, (value, exclude) in filters.items():
-            try:
-                if exclude:
-                    qs = qs.exclude(**{key: value})
+        qs = self.queryset
+        if filters:
+            query = Q()
+            for key, (value, exclude) in filters.items():
+                query &= ~Q(**{key: value}) if exclude else Q(**{key: value})
 
-                else:
-                    qs = qs.filter(**{key: value})
+            try:
+                qs = qs.filter(query)
             except FieldError, e:
-                logger.warning(e)
+                raise HttpError(str(e), status=HTTP_400_BAD_REQUEST)
+
+        query = request.GET.get(self._meta.dyn_prefix + 'q')
+        if query and self._meta.search_index:
+            qs = self._meta.search_index.search(qs, query)
 
         sorting = self.get_sorting(request, **resources)
         if sorting:
             qs = qs.order_by(*sorting)
 
+        fields = self.get_fields(request)
+        if fields and request.method == 'GET':
+            qs = self.narrow_queryset(qs, fields)
+
         return qs
 
+    def get_fields(self, request):
+        """ Get fields requested by a client (sparse fieldset).
+
+        Fields could be separated by commas: `?adr-fields=name,price`.
+        Client cannot request fields which are not exposed by the resource
+        (primary key is always exposed).
+
+        :return tuple: field's names or None
+
+        """
+        param = self._meta.dyn_prefix + 'fields'
+        if not request or param not in request.GET or \
+                self._meta.emit_fieldset is None:
+            return None
+
+        fields = tuple(get_list(request.GET.getlist(param)))
+
+        unknown = set(fields) - self._meta.emit_fieldset - set([
+            self._meta.model._meta.pk.name])
+        if unknown:
+            raise HttpError(
+                "Unknown fields: %s" % ', '.join(sorted(unknown)),
+                status=HTTP_400_BAD_REQUEST)
+
+        return fields
+
+    def get_emit_models(self, request=None):
+        """ Restrict serialized fields by client's sparse fieldset.
+
+        :return dict: model options
+
+        """
+        options = super(DynamicMixin, self).get_emit_models(request)
+        fields = self.get_fields(request)
+        if not fields:
+            return options
+
+        related = options.get('related') or dict()
+        return dict(options, fields=fields, related=dict(
+            (name, related[name]) for name in fields if name in related))
+
+    def narrow_queryset(self, queryset, fields):
+        """ Load from database only the fields (and required relations).
+
+        Queryset is not changed when some of the fields are calculated by
+        resource's hooks or model's properties, they could use any column.
+
+        :return queryset: queryset
+
+        """
+        select, prefetch = self._meta.emit_relations or ([], [])
+        prefetched = set(p.split(LOOKUP_SEP)[0] for p in prefetch)
+
+        for name in fields:
+            if getattr(self, 'to_simple__%s' % name, None) or (
+                    name not in self._meta.fields and name not in prefetched):
+                return queryset
+
+        # Deferred fields cannot be traversed with select_related
+        queryset = queryset.only(*(
+            set(fields) | set(s.split(LOOKUP_SEP)[0] for s in select)))
+
+        if prefetch:
+            queryset = queryset.prefetch_related(None).prefetch_related(*(
+                p for p in prefetch if p.split(LOOKUP_SEP)[0] in fields))
+
+        return queryset
+
     def get_default_filters(self, **resources):
         """ Return default filters by a model fields.
 
@@ -119,39 +321,86 @@ class DynamicMixin(MixinBase):
     def get_filters(self, request, **resources):
         """ Make filters from GET variables.
 
+        Filters are compiled by `Meta.filter_fields`. Multiple values are
+        joined with `in` lookup, `__not` suffix excludes values.
+
         :return dict: filters
 
         """
         filters = dict()
 
-        if not self._meta.fields:
-            return filters
+        for param in request.GET.iterkeys():
+            try:
+                key, lookup, exclude, convert, path = \
+                    self._meta.filters[param]
 
-        for field in request.GET.iterkeys():
-            tokens = field.split(LOOKUP_SEP)
-            field_name = tokens[0]
+            except KeyError:
+                if param.split(LOOKUP_SEP, 1)[0] not in (
+                        self._meta.fields or ()):
+                    continue
 
-            if field_name not in self._meta.fields:
-                continue
+                if self._meta.filter_fields is not None:
+                    raise HttpError(
+                        "Filter is not allowed: %s" % param,
+                        status=HTTP_400_BAD_REQUEST)
 
-            exclude = False
-            if tokens[-1] == 'not':
-                exclude = True
-                tokens.pop()
+                filters.update(self.get_raw_filter(request, param))
+                continue
 
-            value = request.GET.getlist(field)
-            if len(tokens) == 1:
-                value = map(self._meta.model._meta.get_field(field_name).to_python, value)
+            self.check_index(param, path, lookup)
 
-            if len(value) > 1:
-                tokens.append('in')
-            else:
+            try:
+                value = [convert(v) for v in request.GET.getlist(param)]
+            except (ValidationError, ValueError, TypeError):
+                raise HttpError(
+                    "Invalid value of filter: %s" % param,
+                    status=HTTP_400_BAD_REQUEST)
+
+            if lookup == 'exact' and len(value) > 1:
+                key += LOOKUP_SEP + 'in'
+
+            elif lookup != 'in':
+                if len(value) > 1:
+                    raise HttpError(
+                        "Filter accepts only one value: %s" % param,
+                        status=HTTP_400_BAD_REQUEST)
                 value = value.pop()
 
-            filters[LOOKUP_SEP.join(tokens)] = (value, exclude)
+            filters[key] = (value, exclude)
 
         return filters
 
+    def get_raw_filter(self, request, param):
+        """ Make a filter which is not compiled (`Meta.filter_fields` is not
+        defined). Values are not converted, invalid filters are skipped.
+
+        :return dict: filter
+
+        """
+        key, exclude = param, False
+        if key.endswith(LOOKUP_SEP + 'not'):
+            key, exclude = key[:-len(LOOKUP_SEP + 'not')], True
+
+        path, lookup = key, 'exact'
+        if LOOKUP_SEP in key and key.rsplit(LOOKUP_SEP, 1)[1] in QUERY_TERMS:
+            path, lookup = key.rsplit(LOOKUP_SEP, 1)
+
+        value = request.GET.getlist(param)
+        if len(value) > 1:
+            if lookup == 'exact':
+                key += LOOKUP_SEP + 'in'
+        else:
+            value = value.pop()
+
+        try:
+            self._meta.model._default_manager.filter(**{key: value})
+        except (FieldError, ValidationError, ValueError, TypeError), e:
+            logger.warning(e)
+            return dict()
+
+        self.check_index(param, path, lookup)
+        return {key: (value, exclude)}
+
     def get_sorting(self, request, **resources):
         """ Get sorting options.
 
@@ -164,7 +413,81 @@ class DynamicMixin(MixinBase):
             return sorting
 
         prefix = self._meta.dyn_prefix + 'sort'
-        return request.GET.getlist(prefix)
+        sorting = request.GET.getlist(prefix)
+        for name in sorting:
+            self.check_index(name, name.lstrip('-'))
+
+        return sorting
+
+    def check_index(self, param, path, lookup='exact'):
+        """ Apply `Meta.index_policy` to a filter or sorting. """
+        policy = self._meta.index_policy
+        if policy == 'allow' or not self._meta.model or \
+                is_indexed(self._meta.model, path, lookup):
+            return
+
+        message = "Filter or sorting is not served by an index: %s" % param
+        if policy == 'reject':
+            raise HttpError(message, status=HTTP_400_BAD_REQUEST)
+
+        logger.warning(message)
+
+    def aggregate(self, request, collection):
+        """ Aggregate collection by `adr-aggregate` and `adr-group` params.
+
+        Aggregates are separated by commas: `count`, `count:<field>`,
+        `sum:<field>`, `avg:<field>`, `min:<field>`, `max:<field>`. Only
+        fields from `Meta.filter_fields` could be aggregated and grouped. ::
+
+            ?adr-aggregate=count,sum:price
+
+            {"count": 3, "price__sum": 1296}
+
+            ?adr-aggregate=count,sum:price&adr-group=status
+
+            {"columns": ["status", "count", "price__sum"],
+             "rows": [[1, 2, 864], [2, 1, 432]]}
+
+        :return object: aggregation or None
+
+        """
+        aggregate = self._meta.dyn_prefix + 'aggregate'
+        group = self._meta.dyn_prefix + 'group'
+        if not isinstance(collection, QuerySet) or (
+                aggregate not in request.GET and group not in request.GET):
+            return None
+
+        fields = set(spec[4] for spec in self._meta.filters.values())
+
+        aggregates = dict()
+        for name in get_list(request.GET.getlist(aggregate)) or ['count']:
+            func, _, field = name.partition(':')
+            if func not in AGGREGATES or (field and field not in fields) or \
+                    not (field or func == 'count'):
+                raise HttpError(
+                    "Invalid aggregate: %s" % name,
+                    status=HTTP_400_BAD_REQUEST)
+
+            alias = field + LOOKUP_SEP + func if field else func
+            aggregates[alias] = AGGREGATES[func](field or 'pk')
+
+        groups = get_list(request.GET.getlist(group))
+        unknown = set(groups) - fields
+        if unknown:
+            raise HttpError(
+                "Invalid group: %s" % ', '.join(sorted(unknown)),
+                status=HTTP_400_BAD_REQUEST)
+
+        # Ordering and prefetching do not make sense for aggregation
+        queryset = collection.prefetch_related(None).order_by()
+        if not groups:
+            return queryset.aggregate(**aggregates)
+
+        columns = groups + sorted(aggregates)
+        rows = queryset.values(*groups).annotate(**aggregates).order_by(
+            *groups)
+        return dict(
+            columns=columns, rows=[[row[c] for c in columns] for row in rows])
 
     def paginate(self, request, collection):
         """ Paginate collection.
@@ -172,5 +495,83 @@ class DynamicMixin(MixinBase):
         :return object: Collection or paginator
 
         """
-        p = Paginator(request, self, collection)
-        return p.paginator and p or UpdatedList(collection)
+        p = self._meta.paginator(request, self, collection)
+        if p.paginated:
+            return p
+
+        # Don't load a whole collection into memory for streaming emitters
+        if self._meta.emit_stream and \
+                self.determine_emitter(request).stream:
+            return collection
+
+        return UpdatedList(collection)
+
+
+def get_filter_specs(model, path, lookups):
+    """ Compile filters for the field's path and lookups.
+
+    :return dict: {GET param: (lookup, lookup type, exclude, converter, path)}
+
+    """
+    field, opts = None, model._meta
+    for name in path.split(LOOKUP_SEP):
+        if opts is None:
+            raise AssertionError("Invalid filter: %s" % path)
+        try:
+            field, _, direct, _ = opts.get_field_by_name(name)
+        except FieldDoesNotExist:
+            raise AssertionError("Invalid filter: %s" % path)
+
+        # Reverse relation
+        if not direct:
+            opts = field.model._meta
+            field = opts.pk
+            continue
+
+        opts = field.rel.to._meta if field.rel else None
+
+    if field.rel:
+        field = field.rel.get_related_field()
+
+    specs = dict()
+    for lookup in as_tuple(lookups):
+        if lookup not in QUERY_TERMS:
+            raise AssertionError("Invalid lookup: %s" % lookup)
+
+        key = path if lookup == 'exact' else path + LOOKUP_SEP + lookup
+        convert = unicode
+        if lookup == 'isnull' or (
+                lookup in FIELD_LOOKUPS and isinstance(field, BooleanField)):
+            convert = to_bool
+        elif lookup in FIELD_LOOKUPS:
+            convert = field.to_python
+        specs[key] = key, lookup, False, convert, path
+        specs[key + LOOKUP_SEP + 'not'] = key, lookup, True, convert, path
+
+    return specs
+
+
+def get_list(values):
+    """ Split GET param's values by commas.
+
+    :return list: values
+
+    """
+    return [v.strip() for value in values for v in value.split(',')
+            if v.strip()]
+
+
+def to_bool(value):
+    """ Convert GET param to boolean.
+
+    :return bool:
+
+    """
+    value = value.lower()
+    if value in ('1', 'true', 't', 'yes', 'on'):
+        return True
+
+    if value in ('0', 'false', 'f', 'no', 'off'):
+        return False
+
+    raise ValueError("Invalid boolean: %s" % value)
@@ -1,10 +1,13 @@
 """ ADRest serialization support. """
 import mimeparse
-from django.http import HttpResponse
+from django.http.response import HttpResponseBase
 
+from ..utils.cache import ModelCache, DEFAULT_TIMEOUT
 from ..utils.emitter import JSONEmitter, BaseEmitter
+from ..utils.jsonlib import backend
 from ..utils.meta import MixinBaseMeta
 from ..utils.paginator import Paginator
+from ..utils.serializer import get_digest, get_fieldset, get_relations
 from ..utils.tools import as_tuple
 
 
@@ -35,6 +38,8 @@ class Meta:
     emitters = JSONEmitter
 
     #: Options for low-level serialization
+    #: JSON options are checked by current JSON backend
+    #: (see ``ADREST_JSON_BACKEND``).
     #: Example for JSON serialization
     #:
     #: ::
@@ -111,6 +116,42 @@ class Meta:
     #:
     emit_format = 'django'
 
+    #: Stream serialized collections (QuerySets, generators, paginators)
+    #: to a client by chunks. QuerySets are read with `iterator()`.
+    #: Only emitters which support streaming are affected (JSON, JSONP, XML).
+    #: Streaming is not compatible with resource's `to_simple` method.
+    #:
+    #: ::
+    #:
+    #:     class ExportResource(EmitterMixin, View):
+    #:         class Meta:
+    #:             model = 'app.model'
+    #:             limit_per_page = 0
+    #:             emit_stream = True
+    #:
+    emit_stream = False
+
+    #: Cache simplified instances of resource's model between requests.
+    #: Set True for default cache's timeout or a timeout in seconds.
+    #: Cached entries are deleted when instances are saved or deleted, so
+    #: `to_simple__<field>` methods should not depend on a request.
+    #: Changes of related objects are not tracked.
+    #: See :class:`adrest.utils.cache.ModelCache`.
+    #:
+    #: ::
+    #:
+    #:     class CountryResource(ResourceView):
+    #:         class Meta:
+    #:             model = 'geo.country'
+    #:             emit_cache = 3600
+    #:             emit_cache_version = 'updated_at'
+    #:
+    emit_cache = None
+
+    #: Name of model's field which is changed with an instance
+    #: (`updated_at`, `version`). Its value is a part of cache's keys.
+    emit_cache_version = None
+
 
 class EmitterMeta(MixinBaseMeta):
 
@@ -133,6 +174,11 @@ class EmitterMeta(MixinBaseMeta):
                     "`adrest.utils.emitter.BaseEmitter`"
                 )
 
+        # Check options are supported by JSON backend
+        if cls._meta.emit_options and any(
+                issubclass(e, JSONEmitter) for e in cls._meta.emitters):
+            backend.prepare_options(cls._meta.emit_options)
+
         if cls._meta.emit_models is None:
             cls._meta.emit_models = dict()
 
@@ -148,6 +194,34 @@ class EmitterMeta(MixinBaseMeta):
         if cls._meta.emit_related:
             cls._meta.emit_models['related'] = cls._meta.emit_related
 
+        if cls._meta.model:
+
+            # Fields which are exposed to clients
+            cls._meta.emit_fieldset = frozenset(get_fieldset(
+                cls._meta.model, cls._meta.emit_models))
+
+            # Relations which should be loaded with resource's queryset
+            cls._meta.emit_relations = get_relations(
+                cls._meta.model, cls._meta.emit_models, cls)
+
+            # Cache of serialized instances
+            if cls._meta.emit_cache:
+                cls._meta.emit_model_cache = ModelCache(
+                    cls._meta.model,
+                    timeout=DEFAULT_TIMEOUT if cls._meta.emit_cache is True
+                    else cls._meta.emit_cache,
+                    version=cls._meta.emit_cache_version)
+                cls._meta.emit_model_cache.register(get_digest(
+                    cls._meta.model, cls._meta.emit_models, cls,
+                    cls._meta.emit_format))
+
+        # Streamed content is not simplified as a whole
+        hooks = [base for base in cls.mro() if 'to_simple' in vars(base)]
+        cls._meta.emit_simple_hook = bool(hooks) and hooks[0] is not hooks[-1]
+        if cls._meta.emit_stream and cls._meta.emit_simple_hook:
+            raise AssertionError(
+                "Resource.to_simple is not compatible with `emit_stream`.")
+
         return cls
 
 
@@ -192,7 +266,7 @@ class EmitterMixin(object):
         # Serialize the response content
         response = emitter.emit()
 
-        if not isinstance(response, HttpResponse):
+        if not isinstance(response, HttpResponseBase):
             raise AssertionError("Emitter must return HttpResponse")
 
         # Append pagination headers
@@ -208,6 +282,14 @@ class EmitterMixin(object):
 
         return response
 
+    def get_emit_models(self, request=None):
+        """ Get options for serialization of models.
+
+        :return dict: model options (see `Meta.emit_models`)
+
+        """
+        return self._meta.emit_models
+
     @staticmethod
     def to_simple(content, simple, serializer=None):
         """ Abstract method for modification a structure before serialization.
@@ -1,13 +1,21 @@
 """ Implement REST functionality. """
 from django.core.exceptions import ObjectDoesNotExist, MultipleObjectsReturned
+from django.db import router
+from django.db.models import Model
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.fields.related import ManyToManyField
+from django.db.models.query import QuerySet
 from django.http import HttpResponse
+from django.utils.datastructures import SortedDict
 from logging import getLogger
 
 from ..forms import PartitialForm
 from ..settings import ADREST_ALLOW_OPTIONS
 from ..utils import status, UpdatedList
+from ..utils.cache import invalidate, touch
 from ..utils.exceptions import HttpError, FormError
-from ..utils.tools import as_tuple
+from ..utils.search import has_index
+from ..utils.tools import as_tuple, atomic
 from .dynamic import DynamicMixin, DynamicMixinMeta
 
 
@@ -51,6 +59,30 @@ class Meta:
     #: Exclude field's names for automatic a model form
     form_exclude = None
 
+    #: Insert resources from a POSTed list (JSON array or NDJSON) with
+    #: `bulk_create` by batches. Set True for default batch's size or a
+    #: size. Model's `save()` and signals are not called, many-to-many
+    #: fields are not saved, cached counts are reset. The response is
+    #: `{"count": <created>}`. Plain forms and models with full-text search
+    #: indexes are saved one by one as usual.
+    bulk_create = None
+
+    #: Update multiple resources (PUT/PATCH) with one `UPDATE` statement.
+    #: Data are validated once by the first resource. Forms with custom
+    #: cleaning or saving, models with custom `save()` or `clean()` and
+    #: unique fields (`unique_together` too) are updated one by one as
+    #: usual. Signals are not sent, caches of the resources are invalidated.
+    bulk_update = None
+
+    #: Delete multiple resources with `QuerySet.delete` by chunks of primary
+    #: keys, each chunk in its own transaction. Set True for default chunk's
+    #: size or a size. Models with custom `delete()` are deleted one by one.
+    bulk_delete = None
+
+
+#: Default size of batches for `Meta.bulk_create` and `Meta.bulk_delete`
+BULK_BATCH_SIZE = 500
+
 
 class HandlerMeta(DynamicMixinMeta):
 
@@ -165,8 +197,12 @@ class HandlerMixin(DynamicMixin):
         if not instance is None:
             return instance
 
-        return self.paginate(
-            request, self.get_collection(request, **resources))
+        collection = self.get_collection(request, **resources)
+        aggregation = self.aggregate(request, collection)
+        if aggregation is not None:
+            return aggregation
+
+        return self.paginate(request, collection)
 
     def post(self, request, **resources):
         """ Default POST method. Uses the handler's form.
@@ -177,12 +213,58 @@ class HandlerMixin(DynamicMixin):
         if not self._meta.form:
             return None
 
+        if isinstance(request.data, list):
+            return self.post_list(request, **resources)
+
         form = self._meta.form(request.data, **resources)
         if form.is_valid():
             return form.save()
 
         raise FormError(form)
 
+    def post_list(self, request, **resources):
+        """ Create resources from a list of items. Uses the handler's form.
+
+        Resources are saved in one transaction when all of the items are
+        valid. Otherwise errors are returned by items' positions: ::
+
+            [{"index": 2, "errors": {"title": ["This field is required."]}}]
+
+        :return object: created resources (see `Meta.bulk_create`)
+
+        """
+        forms, errors = [], []
+        for index, item in enumerate(request.data):
+            if not isinstance(item, dict):
+                errors.append(dict(index=index, errors="Invalid item."))
+                continue
+
+            form = self._meta.form(item, **resources)
+            if form.is_valid():
+                forms.append(form)
+            else:
+                errors.append(dict(index=index, errors=form.errors))
+
+        if errors:
+            raise HttpError(errors, status=status.HTTP_400_BAD_REQUEST)
+
+        form_meta = getattr(self._meta.form, '_meta', None)
+        model = getattr(form_meta, 'model', None) or self._meta.model
+        with atomic(using=router.db_for_write(model)):
+
+            # Signals are required for full-text indexes
+            if not self._meta.bulk_create or form_meta is None or \
+                    has_index(model):
+                return UpdatedList([form.save() for form in forms])
+
+            model._default_manager.bulk_create(
+                [form.save(commit=False) for form in forms],
+                batch_size=BULK_BATCH_SIZE if self._meta.bulk_create is True
+                else self._meta.bulk_create)
+
+        touch(model)
+        return dict(count=len(forms))
+
     def put(self, request, **resources):
         """ Default PUT method. Uses self form. Allow bulk update.
 
@@ -197,17 +279,100 @@ class HandlerMixin(DynamicMixin):
                 "Resource not found.", status=status.HTTP_404_NOT_FOUND)
         resource = resources.pop(self._meta.name)
 
+        if self._meta.bulk_update and isinstance(resource, QuerySet):
+            fields = get_update_fields(self._meta.form, request.data)
+            if fields is not None:
+                return self.put_queryset(
+                    request, resource, fields, **resources)
+
         updated = UpdatedList()
         for o in as_tuple(resource):
-            form = self._meta.form(data=request.data, instance=o, **resources)
+            form = self.get_form(request, o, resources)
 
-            if not form.is_valid():
-                raise FormError(form)
+            if request.method != 'PATCH':
+                updated.append(form.save())
+                continue
+
+            instance = form.save(commit=False)
+
+            # Custom `save()` could change other columns
+            if type(instance).save != Model.save:
+                instance.save()
+
+            # Write only the changed columns
+            else:
+                instance.save(update_fields=[
+                    f.name for f in instance._meta.fields
+                    if f.name in form.fields or getattr(f, 'auto_now', False)])
 
-            updated.append(form.save())
+            form.save_m2m()
+            updated.append(instance)
 
         return updated if len(updated) > 1 else updated[-1]
 
+    def get_form(self, request, instance, resources):
+        """ Make and validate the form for updated resource.
+
+        Only fields which are present in the data are validated for PATCH
+        requests.
+
+        :return form: valid form or raise form's error
+
+        """
+        form = self._meta.form(
+            data=request.data, instance=instance, **resources)
+
+        if request.method == 'PATCH':
+            form.fields = SortedDict(
+                (name, field) for name, field in form.fields.items()
+                if name in request.data)
+
+        if not form.is_valid():
+            raise FormError(form)
+
+        return form
+
+    def put_queryset(self, request, queryset, fields, **resources):
+        """ Update resources with one statement (see `Meta.bulk_update`).
+
+        :return object: changed instances or raise form's error
+
+        """
+        instance = next(iter(queryset[:1]), None)
+        if instance is None:
+            raise HttpError(
+                "Resource not found.", status=status.HTTP_404_NOT_FOUND)
+
+        form = self.get_form(request, instance, resources)
+
+        # Updated fields could be filtered by the queryset
+        model = queryset.model
+        pks = list(queryset.values_list('pk', flat=True))
+        queryset = model._default_manager.filter(pk__in=pks)
+
+        if fields:
+            values = dict(
+                (name, form.cleaned_data[name]) for name in fields)
+            values.update(
+                (f.name, f.pre_save(instance, False))
+                for f in model._meta.fields if getattr(f, 'auto_now', False))
+
+            with atomic(using=router.db_for_write(model)):
+                queryset.update(**values)
+
+        # Keep relations of the resource's queryset, updated instances could
+        # leave it
+        updated = UpdatedList(self.queryset.filter(pk__in=pks))
+        if len(updated) < len(pks):
+            updated = UpdatedList(queryset)
+
+        # Signals are not sent by `update`
+        if fields:
+            for instance in updated:
+                invalidate(model, instance)
+
+        return updated[0] if len(updated) == 1 else updated
+
     def delete(self, request, **resources):
         """ Default DELETE method. Allow bulk delete.
 
@@ -219,13 +384,37 @@ class HandlerMixin(DynamicMixin):
         if not resource:
             raise HttpError("Bad request", status=status.HTTP_404_NOT_FOUND)
 
-        for o in as_tuple(resource):
-            o.delete()
+        if self._meta.bulk_delete and isinstance(resource, QuerySet) and \
+                resource.model.delete == Model.delete:
+            self.delete_queryset(resource)
+
+        else:
+            for o in as_tuple(resource):
+                o.delete()
 
         return HttpResponse("")
 
+    def delete_queryset(self, queryset):
+        """ Delete resources by chunks (see `Meta.bulk_delete`).
+
+        Short transactions do not lock the table for a long time, but a
+        failed request could delete some of the resources.
+
+        """
+        size = BULK_BATCH_SIZE if self._meta.bulk_delete is True \
+            else self._meta.bulk_delete
+        model = queryset.model
+        using = router.db_for_write(model)
+
+        pks = list(queryset.values_list('pk', flat=True))
+        for n in xrange(0, len(pks), size):
+            with atomic(using=using):
+                model._base_manager.using(using).filter(
+                    pk__in=pks[n:n + size]).delete()
+
     def patch(self, request, **resources):
-        """ Default PATCH method.
+        """ Default PATCH method. Only fields which are present in the data
+        are validated and saved.
 
         :return object: changed instance or raise form's error
 
@@ -267,21 +456,27 @@ class HandlerMixin(DynamicMixin):
         pks = (
             resources.get(self._meta.name) or
             request.REQUEST.getlist(self._meta.name) or
-            getattr(request, 'data', None) and request.data.get(
-                self._meta.name))
+            getattr(request, 'data', None) and
+            not isinstance(request.data, list) and
+            request.data.get(self._meta.name))
 
-        if not pks or self._meta.queryset is None:
+        if not pks or self.queryset is None:
             return resources
 
         pks = as_tuple(pks)
 
+        # Respect client's sparse fieldset
+        queryset = self.queryset
+        fields = not self.child and self.get_fields(request)
+        if fields and request.method == 'GET':
+            queryset = self.narrow_queryset(queryset, fields)
+
         try:
             if len(pks) == 1:
-                resources[self._meta.name] = self._meta.queryset.get(pk=pks[0])
+                resources[self._meta.name] = queryset.get(pk=pks[0])
 
             else:
-                resources[self._meta.name] = self._meta.queryset.filter(
-                    pk__in=pks)
+                resources[self._meta.name] = queryset.filter(pk__in=pks)
 
         except (ObjectDoesNotExist, ValueError, AssertionError):
             raise HttpError("Resource not found.",
@@ -294,4 +489,42 @@ class HandlerMixin(DynamicMixin):
         return resources
 
 
+def get_update_fields(form, data):
+    """ Get names of model's fields which are updated by the data in bulk.
+
+    :return list: field's names or None if the data could not be applied
+        by one statement
+
+    """
+    model = form._meta.model
+    if isinstance(data, list) or model.save != Model.save or \
+            model.clean != Model.clean or any(
+                getattr(form, name) != getattr(PartitialForm, name, None)
+                for name in dir(form) if name == 'save' or
+                name.startswith('clean')):
+        return None
+
+    # Uniqueness is validated for the first instance only
+    unique = set(
+        name for names in model._meta.unique_together for name in names)
+
+    fields = []
+    for name in data or ():
+        if not name in form.base_fields:
+            continue
+
+        try:
+            field = model._meta.get_field(name)
+        except FieldDoesNotExist:
+            continue
+
+        if field.primary_key or field.unique or name in unique or \
+                isinstance(field, ManyToManyField):
+            return None
+
+        fields.append(name)
+
+    return fields
+
+
 # pymode:lint_ignore=E1102,W0212,R0924
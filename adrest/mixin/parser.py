@@ -1,6 +1,7 @@
 """ ADRest parse data. """
 from ..utils.meta import MixinBaseMeta
-from ..utils.parser import FormParser, XMLParser, JSONParser, AbstractParser
+from ..utils.parser import (
+    FormParser, XMLParser, JSONParser, NDJSONParser, AbstractParser)
 from ..utils.tools import as_tuple
 
 __all__ = 'ParserMixin',
@@ -37,7 +38,7 @@ class ParserMixin(object):
     __metaclass__ = ParserMeta
 
     class Meta:
-        parsers = FormParser, XMLParser, JSONParser
+        parsers = FormParser, XMLParser, JSONParser, NDJSONParser
 
     def parse(self, request):
         """ Parse request content.
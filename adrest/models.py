@@ -56,15 +56,19 @@ if settings.ADREST_ACCESS_LOG:
         if not resource._meta.log:
             return
 
-        try:
-            content = smart_unicode(response.content)[:5000]
-        except (UnicodeDecodeError, UnicodeEncodeError):
-            if response and response['Content-Type'].lower() not in \
-                    [emitter.media_type.lower()
-                     for emitter in resource.emitters]:
-                content = 'Invalid response content encoding'
-            else:
-                content = response.content[:5000]
+        if getattr(response, 'streaming', False):
+            content = 'Streamed response content'
+
+        else:
+            try:
+                content = smart_unicode(response.content)[:5000]
+            except (UnicodeDecodeError, UnicodeEncodeError):
+                if response and response['Content-Type'].lower() not in \
+                        [emitter.media_type.lower()
+                         for emitter in resource.emitters]:
+                    content = 'Invalid response content encoding'
+                else:
+                    content = response.content[:5000]
 
         Access.objects.create(
             uri=request.path_info,
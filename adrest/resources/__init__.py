@@ -1,5 +1,6 @@
 " Predefined resources for ADREST. "
 
+from .export import ExportResource
 from .map import MapResource
 from .rpc import RPCResource, AutoJSONRPC
 
@@ -0,0 +1,160 @@
+""" Export collections of resources to files. """
+from copy import copy
+from os import path as op
+
+from django.core.servers.basehttp import FileWrapper
+from django.db.models.query import QuerySet
+from django.http import QueryDict, StreamingHttpResponse
+
+from ..utils import status
+from ..utils.emitter import JSONEmitter
+from ..utils.exceptions import HttpError
+from ..utils.export import Export, FORMATS
+from ..utils.response import SerializedHttpResponse
+from ..utils.tools import as_tuple
+from ..views import ResourceView
+
+
+__all__ = 'ExportResource',
+
+
+class ExportResource(ResourceView):
+
+    """ Export a resource's collection to a file in background.
+
+    Start a job (filters, sorting and search of the resource are
+    supported): ::
+
+        POST /export
+        {"resource": "book", "format": "csv", "query": "author=1"}
+
+    Get the job's state and download the file: ::
+
+        GET /export/<id>
+        {"id": "...", "status": "done", "count": 42, "total": 42,
+         "url": ".../export/<id>", "download": ".../export/<id>/download"}
+
+        GET /export/<id>/download
+
+    Client should be authenticated by the exported resource. The job and
+    its file are available only for the client which has started it.
+    Collection is taken from the resource's GET method without pagination.
+
+    """
+
+    class Meta:
+        allowed_methods = 'GET', 'POST'
+        emitters = JSONEmitter
+        url_regex = r'^export(?:/(?P<export>[0-9a-f]{32})' \
+            r'(?P<download>/download)?)?$'
+
+        #: Run jobs in background threads
+        export_background = True
+
+    def get(self, request, export=None, download=None, **resources):
+        """ Get the job's state or download the exported file.
+
+        :return object: job's state or file response
+
+        """
+        job = export and Export.load(export)
+        if not job or job.expired or self.get_target(
+                request, job.state['resource']).identifier != \
+                job.state['owner']:
+            raise HttpError("Export not found.",
+                            status=status.HTTP_404_NOT_FOUND)
+
+        if not download:
+            return self.get_state(request, job, request.path)
+
+        if job.state['status'] != 'done':
+            raise HttpError("Export is not ready.",
+                            status=status.HTTP_409_CONFLICT)
+
+        response = StreamingHttpResponse(
+            FileWrapper(open(job.path, 'rb')), content_type=job.media_type)
+        response['Content-Length'] = op.getsize(job.path)
+        response['Content-Disposition'] = 'attachment; filename="%s"' % (
+            op.basename(job.path))
+        return response
+
+    def post(self, request, **resources):
+        """ Start export of a resource's collection.
+
+        :return object: job's state
+
+        """
+        data = request.data or dict()
+        name, format = data.get('resource'), data.get('format', 'ndjson')
+
+        if format not in FORMATS:
+            raise HttpError("Unknown format of export: %s" % format,
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        query = data.get('query') or ''
+        if isinstance(query, dict):
+            params = QueryDict('', mutable=True)
+            for key, value in query.items():
+                params.setlist(key, [unicode(v) for v in as_tuple(value)])
+            query = params.urlencode()
+
+        # Collection is taken by the resource as for GET request
+        collection_request = copy(request)
+        collection_request.method = 'GET'
+        collection_request.GET = QueryDict(query)
+        collection_request.data = dict()
+
+        target = self.get_target(collection_request, name)
+        target.throttle_check()
+        target.check_rights(dict(), request=collection_request)
+        target.paginate = lambda request, collection: collection
+        queryset = target.handle_request(collection_request)
+        if not isinstance(queryset, QuerySet):
+            raise HttpError("Resource could not be exported: %s" % name,
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        Export.clean()
+        job = Export(
+            format, resource=name, query=query, owner=target.identifier)
+        if self._meta.export_background:
+            job.start(target, queryset)
+        else:
+            job.save()
+            job.run(target, queryset)
+
+        return SerializedHttpResponse(
+            self.get_state(request, job, '%s/%s' % (
+                request.path.rstrip('/'), job.id)),
+            status=status.HTTP_202_ACCEPTED)
+
+    def get_target(self, request, name):
+        """ Create the exported resource and authenticate the request.
+
+        :return ResourceView: resource
+
+        """
+        resource = self.api and self.api.resources.get(name)
+        if not resource or not resource._meta.model or \
+                resource._meta.parent or \
+                'GET' not in resource._meta.allowed_methods:
+            raise HttpError("Resource could not be exported: %s" % name,
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        target = resource()
+        target.identifier = request.META.get('REMOTE_ADDR', 'anonymous')
+        target.authenticate(request)
+        return target
+
+    @staticmethod
+    def get_state(request, job, path):
+        """ Get the job's state with URLs.
+
+        :return dict: state
+
+        """
+        url = request.build_absolute_uri(path.rstrip('/'))
+        state = dict(job.state, url=url, download=None)
+        state.pop('owner')
+        if job.state['status'] == 'done':
+            state['download'] = url + '/download'
+        return state
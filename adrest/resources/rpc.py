@@ -1,9 +1,9 @@
 """ RPC support. """
-import json as js
 from django.http import QueryDict, HttpResponse
 from django.utils import importlib
 
 from ..utils.emitter import JSONPEmitter, JSONEmitter
+from ..utils.jsonlib import backend
 from ..utils.parser import JSONParser, FormParser
 from ..utils.response import SerializedHttpResponse
 from ..utils.tools import as_tuple
@@ -23,6 +23,28 @@ def get_request(func):
     return func
 
 
+def get_methods(scheme):
+    """ Get RPC methods from scheme.
+
+    :return tuple: scheme's name, {"scheme.method": method}
+
+    """
+    if isinstance(scheme, basestring):
+        scheme = importlib.import_module(scheme)
+
+    names = getattr(scheme, '__all__', None) \
+        or [m for m in dir(scheme) if not m.startswith('_')]
+
+    methods = dict()
+    for mname in names:
+        method = getattr(scheme, mname)
+        if hasattr(method, '__call__'):
+            methods["{0}.{1}".format(scheme.__name__, method.__name__)] = \
+                method
+
+    return scheme.__name__, methods
+
+
 class RPCMeta(ResourceMetaClass):
 
     """ Setup RPC methods by Scheme. """
@@ -57,8 +79,9 @@ class RPCResource(ResourceView):
     __metaclass__ = RPCMeta
 
     def __init__(self, scheme=None, **kwargs):
+        # Instance's scheme does not change the class (shared by threads)
         if scheme:
-            self.configure_rpc(scheme)
+            self.scheme_name, self.methods = get_methods(scheme)
         super(RPCResource, self).__init__(**kwargs)
 
     @classmethod
@@ -69,19 +92,7 @@ class RPCResource(ResourceView):
         if not scheme:
             return
 
-        if isinstance(scheme, basestring):
-            scheme = importlib.import_module(scheme)
-
-        cls.scheme_name = scheme.__name__
-
-        methods = getattr(scheme, '__all__', None) \
-            or [m for m in dir(scheme) if not m.startswith('_')]
-
-        for mname in methods:
-            method = getattr(scheme, mname)
-            if hasattr(method, '__call__'):
-                cls.methods["{0}.{1}".format(
-                    cls.scheme_name, method.__name__)] = method
+        cls.scheme_name, cls.methods = get_methods(scheme)
 
     def handle_request(self, request, **resources):
         """ Call RPC method.
@@ -101,7 +112,7 @@ class RPCResource(ResourceView):
             if request.method == 'GET':
                 payload = request.GET.get('payload')
                 try:
-                    payload = js.loads(payload)
+                    payload = backend.loads(payload)
                 except TypeError:
                     raise AssertionError("Invalid RPC Call.")
 
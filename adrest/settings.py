@@ -19,6 +19,9 @@ except (ImportError, ImproperlyConfigured):
 
     settings.configure()
 
+from os import path as op
+from tempfile import gettempdir
+
 from .utils.tools import as_tuple
 
 
@@ -55,5 +58,25 @@ ADREST_THROTTLE_TIMEFRAME = getattr(settings, 'ADREST_THROTTLE_TIMEFRAME', 60)
 #: We do not restrict access for OPTIONS request.
 ADREST_ALLOW_OPTIONS = getattr(settings, 'ADREST_ALLOW_OPTIONS', False)
 
+#: JSON backend for serialization and parsing: 'json', 'simplejson' or 'ujson'
+#: Standard 'json' is used if the backend is not installed.
+ADREST_JSON_BACKEND = getattr(settings, 'ADREST_JSON_BACKEND', 'json')
+
+#: Directory for files of export jobs (see `adrest.resources.ExportResource`)
+ADREST_EXPORT_ROOT = getattr(
+    settings, 'ADREST_EXPORT_ROOT', op.join(gettempdir(), 'adrest-export'))
+
+#: Number of primary keys in a chunk of export job
+ADREST_EXPORT_CHUNK = int(getattr(settings, 'ADREST_EXPORT_CHUNK', 10000))
+
+#: Number of processes for export jobs.
+#: ADREST_EXPORT_PROCESSES = 0 -- Export in a thread of the web process
+ADREST_EXPORT_PROCESSES = int(
+    getattr(settings, 'ADREST_EXPORT_PROCESSES', 0))
+
+#: Lifetime of export job's files in seconds. Files of expired jobs are removed
+#: when a new job is started.
+ADREST_EXPORT_EXPIRE = int(getattr(settings, 'ADREST_EXPORT_EXPIRE', 86400))
+
 #: Template path for ADRest map
 ADREST_MAP_TEMPLATE = getattr(settings, 'ADREST_MAP_TEMPLATE', 'api/map.html')
@@ -218,8 +218,10 @@ def reverse(resource, api=None, namespace=None, **resources):
 def jsonify(response):
     """ Check for request content is JSON. """
     if response.get('Content-type') == 'application/json':
+        content = ''.join(response.streaming_content) if getattr(
+            response, 'streaming', False) else response.content
         try:
-            response.json = js.loads(response.content)
+            response.json = js.loads(content)
         except ValueError:
             return response
     return response
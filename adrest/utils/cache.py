@@ -0,0 +1,174 @@
+""" Caches of serialized model's instances and collection's counts. """
+from hashlib import md5
+from time import time
+
+from django.core.cache import cache
+from django.db.models.signals import post_save, post_delete
+from django.utils.encoding import smart_str
+
+try:
+    from django.core.cache.backends.base import DEFAULT_TIMEOUT
+except ImportError: # Django < 1.6
+    DEFAULT_TIMEOUT = None
+
+
+__all__ = 'ModelCache', 'CountCache', 'invalidate', 'touch'
+
+
+#: Registered caches: {model: [cache, ...]}
+CACHES = dict()
+
+#: Models with cached counts
+COUNTED = set()
+
+
+class ModelCache(object):
+
+    """ Store simplified model's instances between requests.
+
+    Cache's key is made from model, instance's primary key, value of the
+    version field (`updated_at`, `version` and etc) and a digest of
+    serialization's options. Entries are deleted when an instance is saved or
+    deleted.
+
+    Entries for options which were not used by the current process (clients'
+    sparse fieldsets) are not deleted. Set a version field or a timeout for
+    them become stale.
+
+    """
+
+    def __init__(self, model, timeout=DEFAULT_TIMEOUT, version=None):
+        self.model = model
+        self.timeout = timeout
+        self.version = version
+        self.digests = set()
+        CACHES.setdefault(model, []).append(self)
+
+    def __repr__(self):
+        return "<ModelCache %s>" % self.model._meta
+
+    def register(self, digest):
+        """ Remember digest of serialization's options for invalidation. """
+        self.digests.add(digest)
+
+    def get_version(self, instance):
+        """ Get a value of instance's version field.
+
+        :return object: version
+
+        """
+        return getattr(instance, self.version) if self.version else None
+
+    def get_key(self, pk, version, digest):
+        """ Make cache's key.
+
+        :return str: key
+
+        """
+        return 'adrest.cache.%s' % md5('%s:%s:%s:%s' % (
+            self.model._meta, smart_str(pk), smart_str(version), digest
+        )).hexdigest()
+
+    @staticmethod
+    def get(key):
+        return cache.get(key)
+
+    @staticmethod
+    def get_many(keys):
+        return cache.get_many(keys)
+
+    def set(self, key, value):
+        cache.set(key, value, self.timeout)
+
+    def set_many(self, values):
+        cache.set_many(values, self.timeout)
+
+    def invalidate(self, instance):
+        """ Delete cached entries of the instance. """
+        pk, version = instance._get_pk_val(), self.get_version(instance)
+        cache.delete_many([
+            self.get_key(pk, version, digest) for digest in self.digests])
+
+
+class CountCache(object):
+
+    """ Store counts of model's collections.
+
+    Cache's key is made from SQL of the collection (filters of resource and
+    client) and a generation of the model. Generation is changed when an
+    instance of the model is saved or deleted.
+
+    Changes of related models do not change the generation, counts of
+    collections which are filtered by relations become stale by timeout.
+
+    """
+
+    def __init__(self, model, timeout=DEFAULT_TIMEOUT):
+        self.model = model
+        self.timeout = timeout
+        COUNTED.add(model)
+
+    def __repr__(self):
+        return "<CountCache %s>" % self.model._meta
+
+    def count(self, queryset):
+        """ Get count of the queryset from cache or database.
+
+        :return int: count
+
+        """
+        sql, params = queryset.order_by().query.sql_with_params()
+        key = 'adrest.count.%s' % md5('%s:%s:%s:%s' % (
+            queryset.db, smart_str(sql), smart_str(repr(params)),
+            get_generation(self.model))).hexdigest()
+
+        count = cache.get(key)
+        if count is None:
+            count = queryset.count()
+            cache.set(key, count, self.timeout)
+
+        return count
+
+
+def get_generation(model):
+    """ Get current generation of the model.
+
+    :return int: generation
+
+    """
+    key = 'adrest.generation.%s' % model._meta
+    generation = cache.get(key)
+    if generation is None:
+        # Generation should not repeat after eviction
+        cache.add(key, int(time() * 1000))
+        generation = cache.get(key)
+
+    return generation
+
+
+def invalidate(sender, instance, **kwargs):
+    """ Delete cached entries of saved or deleted instance. """
+    if getattr(sender, '_deferred', False):
+        sender = sender._meta.proxy_for_model
+
+    for model_cache in CACHES.get(sender, ()):
+        model_cache.invalidate(instance)
+
+    touch(sender)
+
+
+def touch(model):
+    """ Change generation of the model (reset cached counts).
+
+    Call it after bulk operations which do not send signals.
+
+    """
+    if model in COUNTED:
+        try:
+            cache.incr('adrest.generation.%s' % model._meta)
+        except ValueError:
+            pass
+
+
+post_save.connect(invalidate, dispatch_uid='adrest.utils.cache')
+post_delete.connect(invalidate, dispatch_uid='adrest.utils.cache')
@@ -3,22 +3,32 @@
 from datetime import datetime
 from os import path as op
 from time import mktime
+from types import GeneratorType
 
 from django.db.models.base import ModelBase, Model
+from django.db.models.query import QuerySet
+from django.http import StreamingHttpResponse
 from django.template import RequestContext, loader
 
 from ..utils import UpdatedList
 from .paginator import Paginator
 from .response import SerializedHttpResponse
-from .serializer import JSONSerializer, XMLSerializer
+from .serializer import (
+    BaseSerializer, JSONSerializer, ColumnsJSONSerializer, CSVSerializer,
+    XMLSerializer)
 from .status import HTTP_200_OK
 
 
 __all__ = (
-    'NullEmitter', 'TextEmitter', 'JSONEmitter', 'JSONPEmitter', 'XMLEmitter',
+    'NullEmitter', 'TextEmitter', 'JSONEmitter', 'JSONPEmitter',
+    'ColumnsJSONEmitter', 'CSVEmitter', 'XMLEmitter',
     'HTMLTemplateEmitter', 'XMLTemplateEmitter', 'BaseEmitter')
 
 
+#: Content types which could be streamed
+STREAMED = QuerySet, GeneratorType, Paginator, UpdatedList
+
+
 class EmitterMeta(type):
 
     """ Preload format attribute. """
@@ -44,6 +54,10 @@ class BaseEmitter(object):
     media_type = None
     format = None
 
+    #: Low level serialization by chunks (see `resource.Meta.emit_stream`)
+    #: Should be a method which returns a generator.
+    stream = None
+
     def __init__(self, resource, request=None, response=None):
         self.resource = resource
         self.request = request
@@ -60,10 +74,45 @@ class BaseEmitter(object):
         if not isinstance(self.response, SerializedHttpResponse):
             return self.response
 
+        if self.streamed:
+            response = StreamingHttpResponse(
+                self.stream(self.response.response),
+                status=self.response.status_code)
+
+            # Keep headers and cookies which are set by handler
+            response._headers.update(self.response._headers)
+            response.cookies = self.response.cookies
+            response['Content-type'] = self.media_type
+            return response
+
         self.response.content = self.serialize(self.response.response)
         self.response['Content-type'] = self.media_type
         return self.response
 
+    @property
+    def streamed(self):
+        """ Check the response should be streamed.
+
+        :return bool:
+
+        """
+        return bool(
+            self.stream and self.resource._meta.emit_stream
+            and not self.response.error
+            and isinstance(self.response.response, STREAMED))
+
+    @property
+    def model_options(self):
+        """ Get options for serialization of models.
+
+        Client's options are not used for errors.
+
+        :return dict: model options
+
+        """
+        return self.resource.get_emit_models(
+            None if self.response.error else self.request)
+
     @staticmethod
     def serialize(content):
         """ Low level serialization.
@@ -110,6 +159,7 @@ class JSONEmitter(BaseEmitter):
     """ Serialize to JSON. """
 
     media_type = 'application/json'
+    serializer = JSONSerializer
 
     def serialize(self, content):
         """ Serialize to JSON.
@@ -117,13 +167,29 @@ class JSONEmitter(BaseEmitter):
         :return string: serializaed JSON
 
         """
-        worker = JSONSerializer(
+        return self.get_serializer().serialize(content)
+
+    def stream(self, content):
+        """ Serialize to JSON by chunks.
+
+        :return generator: serializaed JSON
+
+        """
+        return self.get_serializer().stream(content)
+
+    def get_serializer(self):
+        """ Create serializer for the resource.
+
+        :return JSONSerializer:
+
+        """
+        return self.serializer(
             scheme=self.resource,
             options=self.resource._meta.emit_options,
             format=self.resource._meta.emit_format,
-            **self.resource._meta.emit_models
+            cache=self.resource._meta.emit_model_cache,
+            **self.model_options
         )
-        return worker.serialize(content)
 
 
 class JSONPEmitter(JSONEmitter):
@@ -142,6 +208,78 @@ class JSONPEmitter(JSONEmitter):
         callback = self.request.GET.get('callback', 'callback')
         return u'%s(%s)' % (callback, content)
 
+    def stream(self, content):
+        """ Serialize to JSONP by chunks.
+
+        :return generator: serializaed JSONP
+
+        """
+        yield u'%s(' % self.request.GET.get('callback', 'callback')
+        for chunk in super(JSONPEmitter, self).stream(content):
+            yield chunk
+        yield u')'
+
+
+class ColumnsJSONEmitter(JSONEmitter):
+
+    """ Serialize collections to JSON columns.
+
+    Column names are not repeated for every item of a collection. ::
+
+        {"columns": ["id", "name"], "rows": [[1, "Jack"], [2, "Bill"]]}
+
+    """
+
+    media_type = 'application/vnd.adrest.columns+json'
+    format = 'columns'
+    serializer = ColumnsJSONSerializer
+    stream = None
+
+
+class CSVEmitter(BaseEmitter):
+
+    """ Serialize collections to CSV.
+
+    Collections (QuerySet, Paginator, UpdatedList) are always streamed,
+    except for resources with `to_simple` method. Columns are ordered by
+    the resource's emitted fields, related models are flattened with `__`
+    (see :class:`adrest.utils.serializer.CSVSerializer`). Pagination's info
+    is available in `Link` header only.
+
+    """
+
+    media_type = 'text/csv'
+
+    def serialize(self, content):
+        """ Serialize to CSV.
+
+        :return string: serializaed CSV
+
+        """
+        return self.get_serializer().serialize(content)
+
+    def stream(self, content):
+        """ Serialize to CSV by chunks.
+
+        :return generator: serializaed CSV
+
+        """
+        return self.get_serializer().stream(content)
+
+    @property
+    def streamed(self):
+        return not self.response.error and isinstance(
+            self.response.response, STREAMED) and \
+            not self.resource._meta.emit_simple_hook
+
+    def get_serializer(self):
+        """ Create serializer for the resource.
+
+        :return CSVSerializer:
+
+        """
+        return CSVSerializer(scheme=self.resource, **self.model_options)
+
 
 class XMLEmitter(BaseEmitter):
 
@@ -156,19 +294,93 @@ class XMLEmitter(BaseEmitter):
         :return string: serialized XML
 
         """
-        worker = XMLSerializer(
-            scheme=self.resource,
-            format=self.resource._meta.emit_format,
-            options=self.resource._meta.emit_options,
-            **self.resource._meta.emit_models
-        )
         return self.xmldoc_tpl % (
+            self.get_envelope() + (self.get_serializer().serialize(content),))
+
+    def stream(self, content):
+        """ Serialize to XML by chunks.
+
+        :return generator: serialized XML
+
+        """
+        head, tail = self.xmldoc_tpl.rsplit('%s', 1)
+        yield head % self.get_envelope()
+        for chunk in self.get_serializer().stream(content):
+            yield chunk
+        yield tail
+
+    def get_envelope(self):
+        """ Get params for the response envelope.
+
+        :return tuple: (success, version, timestamp)
+
+        """
+        return (
             'true' if not self.response.error else 'false',
             str(self.resource.api or ''),
             int(mktime(datetime.now().timetuple())),
-            worker.serialize(content)
         )
 
+    def get_serializer(self):
+        """ Create serializer for the resource.
+
+        :return XMLSerializer:
+
+        """
+        return XMLSerializer(
+            scheme=self.resource,
+            format=self.resource._meta.emit_format,
+            options=self.resource._meta.emit_options,
+            cache=self.resource._meta.emit_model_cache,
+            **self.model_options
+        )
+
+
+try:
+    import msgpack
+
+    class MsgPackEmitter(BaseEmitter):
+
+        """ Serialize to MessagePack.
+
+        Require `msgpack` package. Content is simplified the same way as for
+        JSON.
+
+        """
+
+        media_type = 'application/x-msgpack'
+        format = 'msgpack'
+
+        def serialize(self, content):
+            """ Serialize to MessagePack.
+
+            Byte strings (field's names) are packed as text, so clients
+            could decode them with `raw=False`.
+
+            :return string: packed content
+
+            """
+            return msgpack.packb(
+                self.get_serializer().serialize(content), use_bin_type=False)
+
+        def get_serializer(self):
+            """ Create serializer for the resource.
+
+            :return BaseSerializer:
+
+            """
+            return BaseSerializer(
+                scheme=self.resource,
+                format=self.resource._meta.emit_format,
+                cache=self.resource._meta.emit_model_cache,
+                **self.model_options
+            )
+
+    __all__ += 'MsgPackEmitter',
+
+except ImportError:
+    pass
+
 
 class TemplateEmitter(BaseEmitter):
 
@@ -0,0 +1,323 @@
+""" Export collections to files in background. """
+import csv
+import os
+import re
+from logging import getLogger
+from multiprocessing import Pool
+from os import path as op
+from shutil import copyfileobj
+from threading import Thread
+from time import time
+from uuid import uuid4
+
+from django.db import connections
+from django.db.models import Max, Min
+from django.utils.encoding import smart_str
+
+from ..settings import (
+    ADREST_EXPORT_CHUNK, ADREST_EXPORT_EXPIRE, ADREST_EXPORT_PROCESSES,
+    ADREST_EXPORT_ROOT)
+from .jsonlib import backend
+from .serializer import BaseSerializer, CSVSerializer
+
+
+__all__ = 'Export', 'FORMATS'
+
+
+logger = getLogger('adrest')
+
+#: Formats of exported files: {format: media type}
+FORMATS = dict(ndjson='application/x-ndjson', csv='text/csv')
+
+#: Running jobs: {id: (resource, queryset, format, CSV columns)}
+#: Processes of a pool get the jobs by fork.
+JOBS = dict()
+
+#: Identifiers of jobs
+IDENTIFIER = re.compile(r'^[0-9a-f]{32}$')
+
+
+class Export(object):
+
+    """ Export job.
+
+    Queryset is read with `iterator()` by primary key's ranges and written
+    to a file in `ADREST_EXPORT_ROOT`. The job's state is stored in a JSON
+    file next to the exported file, so it is available for all processes of
+    the host. ::
+
+        export = Export('csv', resource='book', owner='user')
+        export.start(BookResource(), Book.objects.filter(status=1))
+
+        Export.load(export.id).state
+        {"id": "...", "status": "running", "count": 10000, "total": 42000,
+         ...}
+
+    Items are serialized by the resource as for GET requests, the
+    resource's `to_simple` is applied to every chunk. Chunks are exported
+    by a pool of processes when `processes` is set. Processes are forked,
+    so resources do not have to be importable.
+
+    Files of jobs are removed by :meth:`clean` after
+    `ADREST_EXPORT_EXPIRE` seconds.
+
+    """
+
+    def __init__(self, format='ndjson', id=None, **state):
+        if format not in FORMATS:
+            raise AssertionError("Unknown format of export: %s" % format)
+
+        self.id = id or uuid4().hex
+        self.state = dict(
+            id=self.id, format=format, status='pending', count=0,
+            total=None, error=None, created_at=int(time()),
+            finished_at=None, owner=None)
+        self.state.update(state)
+
+    def __repr__(self):
+        return "<Export %s %s>" % (self.id, self.state['status'])
+
+    @property
+    def path(self):
+        """ Path of exported file. """
+        return op.join(
+            ADREST_EXPORT_ROOT, '%s.%s' % (self.id, self.state['format']))
+
+    @property
+    def media_type(self):
+        return FORMATS[self.state['format']]
+
+    @property
+    def expired(self):
+        return self.state['created_at'] + ADREST_EXPORT_EXPIRE < time()
+
+    @classmethod
+    def load(cls, id):
+        """ Load a job's state.
+
+        :return Export: job or None
+
+        """
+        if not IDENTIFIER.match(id or ''):
+            return None
+
+        try:
+            with open(op.join(ADREST_EXPORT_ROOT, '%s.json' % id)) as f:
+                state = backend.loads(f.read())
+        except (IOError, ValueError):
+            return None
+
+        return cls(**dict((str(k), v) for k, v in state.items()))
+
+    @classmethod
+    def clean(cls):
+        """ Remove files of expired jobs. Unfinished jobs are kept.
+
+        :return int: number of removed jobs
+
+        """
+        if not op.isdir(ADREST_EXPORT_ROOT):
+            return 0
+
+        count = 0
+        for name in os.listdir(ADREST_EXPORT_ROOT):
+            job = name.endswith('.json') and cls.load(name[:-5])
+            if not job or not job.expired or \
+                    job.state['status'] in ('pending', 'running'):
+                continue
+
+            for path in (job.path, op.join(ADREST_EXPORT_ROOT, name)):
+                try:
+                    os.remove(path)
+                except OSError:
+                    pass
+
+            count += 1
+
+        return count
+
+    def save(self, **state):
+        """ Update and store the job's state. """
+        self.state.update(state)
+
+        try:
+            os.makedirs(ADREST_EXPORT_ROOT)
+        except OSError:
+            if not op.isdir(ADREST_EXPORT_ROOT):
+                raise
+
+        path = op.join(ADREST_EXPORT_ROOT, '%s.json' % self.id)
+        with open(path + '.tmp', 'w') as f:
+            f.write(backend.dumps(self.state))
+        os.rename(path + '.tmp', path)
+
+    def start(self, resource, queryset, processes=ADREST_EXPORT_PROCESSES):
+        """ Run the job in a thread.
+
+        :return Thread: thread
+
+        """
+        self.save()
+
+        def target():
+            try:
+                self.run(resource, queryset, processes)
+            finally:
+                for connection in connections.all():
+                    connection.close()
+
+        thread = Thread(target=target, name='adrest-export-%s' % self.id)
+        thread.daemon = True
+        thread.start()
+        return thread
+
+    def run(self, resource, queryset, processes=0, chunk=ADREST_EXPORT_CHUNK):
+        """ Export the queryset. """
+        queryset = queryset.order_by('pk')
+        parts = []
+        try:
+            self.save(status='running', total=queryset.count())
+
+            columns = None
+            if self.state['format'] == 'csv':
+                columns = get_columns(resource, queryset)
+            JOBS[self.id] = resource, queryset, self.state['format'], columns
+
+            tasks = []
+            for n, (low, high) in enumerate(get_ranges(queryset, chunk)):
+                parts.append('%s.%s.part' % (self.path, n))
+                tasks.append((self.id, low, high, parts[-1]))
+
+            if processes and len(tasks) > 1:
+                # Forked processes should not share database connections
+                for connection in connections.all():
+                    connection.close()
+
+                pool = Pool(processes)
+                try:
+                    for count in pool.imap(export_range, tasks):
+                        self.save(count=self.state['count'] + count)
+                finally:
+                    pool.terminate()
+                    pool.join()
+
+            else:
+                for task in tasks:
+                    self.save(count=self.state['count'] + export_range(task))
+
+            with open(self.path + '.tmp', 'wb') as f:
+                if columns:
+                    csv.writer(f).writerow([smart_str(c) for c in columns])
+
+                for part in parts:
+                    with open(part, 'rb') as p:
+                        copyfileobj(p, f)
+
+            os.rename(self.path + '.tmp', self.path)
+            self.save(status='done', finished_at=int(time()))
+
+        except Exception, e: # noqa (any error)
+            logger.exception("Export %s is failed.", self.id)
+            self.save(status='failed', error=str(e), finished_at=int(time()))
+
+        finally:
+            JOBS.pop(self.id, None)
+            for part in parts:
+                if op.exists(part):
+                    os.remove(part)
+
+
+def get_ranges(queryset, chunk):
+    """ Split the queryset by primary key's ranges.
+
+    Non-integer primary keys are not split.
+
+    :return list: [(low, high), ...]
+
+    """
+    bounds = queryset.order_by().aggregate(low=Min('pk'), high=Max('pk'))
+    low, high = bounds['low'], bounds['high']
+    if low is None:
+        return []
+
+    if not isinstance(low, (int, long)):
+        return [(None, None)]
+
+    return [(n, n + chunk) for n in xrange(low, high + 1, chunk)]
+
+
+def get_serializer(resource, format):
+    """ Create serializer for exported items.
+
+    :return BaseSerializer: serializer
+
+    """
+    if format == 'csv':
+        return CSVSerializer(scheme=resource, **resource._meta.emit_models)
+
+    return BaseSerializer(
+        scheme=resource, format=resource._meta.emit_format,
+        **resource._meta.emit_models)
+
+
+def get_columns(resource, queryset):
+    """ Get CSV columns for the queryset. Columns are taken from the first
+    item.
+
+    :return list: column's names
+
+    """
+    serializer = get_serializer(resource, 'csv')
+    first = next(iter(get_items(resource, serializer, queryset[:1])), None)
+    if first is None:
+        return []
+
+    return serializer.get_columns(first, queryset.model)
+
+
+def get_items(resource, serializer, queryset):
+    """ Simplify items of the queryset. Resource's `to_simple` is applied to
+    the list of items.
+
+    :return iterable: items
+
+    """
+    items = serializer.iter_queryset(
+        queryset, True, **serializer.model_options)
+
+    if resource._meta.emit_simple_hook:
+        items = resource.to_simple(
+            queryset, list(items), serializer=serializer)
+
+    return items
+
+
+def export_range(task):
+    """ Write items of the job's primary key's range to a file.
+
+    :return int: number of items
+
+    """
+    id, low, high, path = task
+    resource, queryset, format, columns = JOBS[id]
+
+    if low is not None:
+        queryset = queryset.filter(pk__gte=low, pk__lt=high)
+
+    serializer = get_serializer(resource, format)
+    items = get_items(resource, serializer, queryset)
+
+    count = 0
+    with open(path, 'wb') as f:
+        if columns is None:
+            for count, item in enumerate(items, 1):
+                f.write(backend.dumps(item))
+                f.write('\n')
+
+        else:
+            writer = csv.writer(f)
+            getters = serializer.get_getters(columns)
+            for count, item in enumerate(items, 1):
+                writer.writerow(serializer.get_row(item, getters))
+
+    return count
@@ -0,0 +1,115 @@
+""" Database indexes support. """
+from logging import getLogger
+
+from django.db import connections, router, DatabaseError
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.fields.related import ManyToManyRel
+
+
+__all__ = 'get_indexes', 'is_indexed'
+
+
+logger = getLogger('adrest')
+
+# Separator used to split lookups apart.
+LOOKUP_SEP = '__'
+
+#: Lookups which could be served by a database index
+INDEXED_LOOKUPS = (
+    'exact', 'in', 'gt', 'gte', 'lt', 'lte', 'range', 'isnull', 'startswith',
+    'year')
+
+#: Cache of indexed columns: {model: set(columns)}
+INDEXES = dict()
+
+#: Cache of checked lookups: {(model, path, lookup): bool}
+INDEXED = dict()
+
+
+def get_indexes(model):
+    """ Get columns of the model's table which lead an index.
+
+    Indexes are taken from model's fields and options and from database
+    introspection (when database is available). Results are cached when
+    introspection is done.
+
+    :return set: column's names
+
+    """
+    if model in INDEXES:
+        return INDEXES[model]
+
+    opts = model._meta
+    columns = set(
+        f.column for f in opts.fields if f.primary_key or f.unique
+        or f.db_index)
+
+    for names in tuple(opts.index_together) + tuple(opts.unique_together):
+        if names:
+            columns.add(opts.get_field(names[0]).column)
+
+    connection = connections[router.db_for_read(model)]
+
+    # Introspection of sqlite commits a pending transaction in Django < 1.6
+    if connection.vendor == 'sqlite' and \
+            not hasattr(connection, 'in_atomic_block') and \
+            connection.is_managed():
+        return columns
+
+    try:
+        cursor = connection.cursor()
+        columns.update(connection.introspection.get_indexes(
+            cursor, opts.db_table))
+    except (DatabaseError, NotImplementedError), e:
+        logger.debug("Indexes of '%s' are not introspected: %s",
+                     opts.db_table, e)
+
+    INDEXES[model] = columns
+    return columns
+
+
+def is_indexed(model, path, lookup='exact'):
+    """ Check a filter (or sorting) by the field's path could use an index.
+
+    Relations are joined by primary or foreign keys, so only the last field
+    in the path is checked.
+
+    :return bool:
+
+    """
+    key = model, path, lookup
+    if key in INDEXED:
+        return INDEXED[key]
+
+    indexed = lookup in INDEXED_LOOKUPS
+    if indexed:
+        opts, field = model._meta, None
+        try:
+            for name in path.split(LOOKUP_SEP):
+                if name == 'pk':
+                    field = opts.pk
+                    continue
+
+                field, _, direct, _ = opts.get_field_by_name(name)
+                if not direct:
+                    opts = field.model._meta
+                    field = opts.pk
+
+                elif field.rel:
+                    opts = field.rel.to._meta
+
+        except FieldDoesNotExist:
+            field = None
+
+        if field is None:
+            indexed = False
+
+        elif not isinstance(field.rel, ManyToManyRel):
+            indexed = field.column in get_indexes(field.model)
+
+            # Indexes were not introspected (see `get_indexes`)
+            if field.model not in INDEXES:
+                return indexed
+
+    INDEXED[key] = indexed
+    return indexed
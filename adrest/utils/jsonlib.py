@@ -0,0 +1,121 @@
+""" JSON backends.
+
+Backend is selected by ``ADREST_JSON_BACKEND`` setting. If the backend is
+not installed ADRest falls back to the standard library's `json`.
+
+"""
+from logging import getLogger
+
+from django.utils import importlib
+
+from ..settings import ADREST_JSON_BACKEND
+
+
+__all__ = 'JSONBackend', 'SimpleJSONBackend', 'UJSONBackend', 'get_backend'
+
+
+logger = getLogger('adrest')
+
+
+class JSONBackend(object):
+
+    """ Standard library's json. Supports all of `json.dumps` options. """
+
+    name = 'json'
+
+    def __init__(self):
+        self.module = importlib.import_module(self.name)
+
+    def dumps(self, value, **options):
+        """ Serialize value to JSON.
+
+        :return str: JSON
+
+        """
+        return self.module.dumps(value, **self.prepare_options(options))
+
+    def loads(self, content):
+        """ Parse JSON.
+
+        :return object: python structure
+
+        """
+        return self.module.loads(content)
+
+    @staticmethod
+    def prepare_options(options):
+        """ Translate `json.dumps` options for the backend.
+
+        Raise AssertionError for unsupported options.
+
+        :return dict: options
+
+        """
+        return options
+
+
+class SimpleJSONBackend(JSONBackend):
+
+    """ Simplejson. Supports all of `json.dumps` options. """
+
+    name = 'simplejson'
+
+
+class UJSONBackend(JSONBackend):
+
+    """ UltraJSON. Output is always compact. """
+
+    name = 'ujson'
+
+    #: Supported options of `ujson.dumps`
+    options = (
+        'double_precision', 'encode_html_chars', 'ensure_ascii',
+        'escape_forward_slashes', 'indent', 'sort_keys')
+
+    def prepare_options(self, options):
+        if not options:
+            return options
+
+        options = dict(options)
+
+        # Separators affect only whitespaces
+        separators = options.pop('separators', None)
+        if separators and tuple(s.strip() for s in separators) != (',', ':'):
+            raise AssertionError(
+                "Separators %r are not supported by 'ujson' JSON backend."
+                % (separators,))
+
+        unknown = set(options) - set(self.options)
+        if unknown:
+            raise AssertionError(
+                "Options %s are not supported by 'ujson' JSON backend." %
+                ', '.join(sorted(unknown)))
+
+        return options
+
+
+#: Available JSON backends
+BACKENDS = dict(
+    (b.name, b) for b in (JSONBackend, SimpleJSONBackend, UJSONBackend))
+
+
+def get_backend(name=ADREST_JSON_BACKEND):
+    """ Get JSON backend by name.
+
+    :return JSONBackend: backend
+
+    """
+    if name not in BACKENDS:
+        raise AssertionError("Unknown JSON backend: '%s'." % name)
+
+    try:
+        return BACKENDS[name]()
+
+    except ImportError:
+        logger.warning(
+            "JSON backend '%s' is not installed. Use 'json'.", name)
+        return JSONBackend()
+
+
+#: Current JSON backend
+backend = get_backend()
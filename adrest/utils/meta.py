@@ -1,6 +1,7 @@
 """ Meta support for ADRest classes.
 """
 from django.db.models import get_model, Model
+from django.db.models.query import QuerySet
 
 
 __all__ = 'MixinBaseMeta', 'MixinBase'
@@ -8,10 +9,18 @@ __all__ = 'MixinBaseMeta', 'MixinBase'
 
 class MetaOptions(dict):
 
-    """ Storage for Meta options. """
+    """ Storage for Meta options.
+
+    Options are shared by all of resource's instances (and threads), so
+    querysets are copied on access and their results are never cached.
+
+    """
 
     def __getattr__(self, name):
-        return self.get(name)
+        value = self.get(name)
+        if isinstance(value, QuerySet):
+            return value.all()
+        return value
 
     __setattr__ = dict.__setitem__
 
@@ -96,6 +105,9 @@ class MixinBase(object):
 
     __parent__ = None
 
+    #: Link to a child resource's instance (when the instance is a parent)
+    child = None
+
     @property
     def parent(self):
         """ Cache a instance of self parent class.
@@ -108,5 +120,6 @@ class MixinBase(object):
 
         if not self.__parent__:
             self.__parent__ = self._meta.parent()
+            self.__parent__.child = self
 
         return self.__parent__
@@ -1,20 +1,68 @@
 """ Pagination support. """
 
+from base64 import urlsafe_b64decode, urlsafe_b64encode
 from urllib import urlencode
 
-from django.core.paginator import InvalidPage, Paginator as DjangoPaginator
+from django.core.exceptions import ValidationError
+from django.core.paginator import (
+    InvalidPage, Page, Paginator as DjangoPaginator)
+from django.db.models import Model, Q
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.query import QuerySet
+from django.utils.encoding import smart_unicode
 
 from .exceptions import HttpError
+from .jsonlib import backend
 from .status import HTTP_400_BAD_REQUEST
 
 
+__all__ = 'Paginator', 'CursorPaginator'
+
+
+# Separator used to split lookups apart.
+LOOKUP_SEP = '__'
+
+
+class ProbedPage(Page):
+
+    """ Page of a collection which is not counted.
+
+    Next page exists when one more item than `per_page` has been loaded.
+
+    """
+
+    def __init__(self, object_list, number, paginator, more=False):
+        super(ProbedPage, self).__init__(object_list, number, paginator)
+        self.more = more
+
+    def __repr__(self):
+        return '<Page %s>' % self.number
+
+    def has_next(self):
+        return self.more
+
+    def next_page_number(self):
+        return self.number + 1
+
+    def previous_page_number(self):
+        return self.number - 1
+
+
 class Paginator(object):
 
-    """ Paginate collections. """
+    """ Paginate collections.
+
+    Collection is counted for every page. When counting is disabled
+    (`resource.Meta.paginate_count = False` or `?adr-count=0`) a page is
+    probed by loading `per_page + 1` items, `count` and `num_pages` are null.
+
+    """
 
     def __init__(self, request, resource, response):
         self.query_dict = dict(request.GET.items())
         self.path = request.path
+        self.counted = resource._meta.paginate_count is not False and \
+            self.query_dict.get(resource._meta.dyn_prefix + 'count') != '0'
 
         try:
             per_page = resource._meta.dyn_prefix + 'max'
@@ -27,8 +75,22 @@ class Paginator(object):
         except (ValueError, AssertionError):
             self.paginator = None
 
+        # Cached count (see `resource.Meta.paginate_count_cache`)
+        if self.paginator and self.counted and resource._meta.count_cache \
+                and isinstance(response, QuerySet):
+            self.paginator._count = resource._meta.count_cache.count(response)
+
         self._page = None
 
+    @property
+    def paginated(self):
+        """ Check the collection should be paginated.
+
+        :return bool:
+
+        """
+        return self.paginator is not None
+
     def to_simple(self, serializer=None):
         """ Prepare to serialization.
 
@@ -36,9 +98,9 @@ class Paginator(object):
 
         """
         return dict(
-            count=self.paginator.count,
+            count=self.count,
             page=self.page_number,
-            num_pages=self.paginator.num_pages,
+            num_pages=self.paginator.num_pages if self.counted else None,
             next=self.next_page,
             prev=self.previous_page,
             resources=self.resources,
@@ -54,11 +116,35 @@ class Paginator(object):
         if not self._page:
             try:
                 self._page = self.paginator.page(
-                    self.query_dict.get('page', 1))
+                    self.query_dict.get('page', 1)) if self.counted \
+                    else self.probe_page(self.query_dict.get('page', 1))
             except InvalidPage:
                 raise HttpError("Invalid page", status=HTTP_400_BAD_REQUEST)
         return self._page
 
+    def probe_page(self, number):
+        """ Get page without counting of the collection.
+
+        :return ProbedPage: page
+
+        """
+        try:
+            number = int(number)
+        except (TypeError, ValueError):
+            raise InvalidPage("That page number is not an integer")
+        if number < 1:
+            raise InvalidPage("That page number is less than 1")
+
+        per_page = self.paginator.per_page
+        bottom = (number - 1) * per_page
+        items = list(
+            self.paginator.object_list[bottom:bottom + per_page + 1])
+        if not items and number > 1:
+            raise InvalidPage("That page contains no results")
+
+        return ProbedPage(
+            items[:per_page], number, self.paginator, len(items) > per_page)
+
     @property
     def page_number(self):
         """Get page number.
@@ -75,7 +161,7 @@ class Paginator(object):
         :return int: resources amount
 
         """
-        return self.paginator.count
+        return self.paginator.count if self.counted else None
 
     @property
     def resources(self):
@@ -114,3 +200,259 @@ class Paginator(object):
                 self.query_dict['page'] = previous
             return "%s?%s" % (self.path, urlencode(self.query_dict))
         return ""
+
+
+class CursorPaginator(Paginator):
+
+    """ Paginate querysets by keyset (cursor).
+
+    Collection is ordered by resource's sorting (`adr-sort`) or model's
+    default ordering with a primary key as a tie-breaker. A page is loaded
+    by one range query from an item of the previous page, OFFSET and COUNT
+    are not used.
+
+    Links to next and previous pages contain an opaque `cursor` param.
+    Fields of ordering should not be nullable.
+
+    ::
+
+        class SomeResource(ResourceView):
+            class Meta:
+                model = 'app.model'
+                paginator = CursorPaginator
+
+    """
+
+    def __init__(self, request, resource, response):
+        self.query_dict = dict(request.GET.items())
+        self.path = request.path
+        self.queryset = response
+        self.paginator = None
+        self._page = None
+
+        try:
+            per_page = resource._meta.dyn_prefix + 'max'
+            self.per_page = int(self.query_dict.get(per_page)
+                                or resource._meta.limit_per_page)
+        except ValueError:
+            self.per_page = 0
+
+    @property
+    def paginated(self):
+        """ Check the collection should be paginated.
+
+        :return bool:
+
+        """
+        return self.per_page > 0 and isinstance(self.queryset, QuerySet)
+
+    def to_simple(self, serializer=None):
+        """ Prepare to serialization.
+
+        :return dict: paginator params
+
+        """
+        return dict(
+            next=self.next_page,
+            prev=self.previous_page,
+            resources=self.resources,
+        )
+
+    @property
+    def ordering(self):
+        """ Get ordering of the collection with a primary key at the end.
+
+        :return list: [(field's lookup, descending), ...]
+
+        """
+        query = self.queryset.query
+        order_by = query.order_by or (
+            query.default_ordering and query.get_meta().ordering or [])
+
+        pk = self.queryset.model._meta.pk.name
+        ordering = []
+        for name in order_by:
+            if name == '?':
+                raise HttpError(
+                    "Random ordering is not supported by cursor pagination",
+                    status=HTTP_400_BAD_REQUEST)
+
+            desc = name.startswith('-')
+            name = name.lstrip('-')
+            ordering.append(('pk' if name == pk else name, desc))
+
+        if not any(name == 'pk' for name, _ in ordering):
+            ordering.append(('pk', False))
+
+        return ordering
+
+    @property
+    def page(self):
+        """ Get items of current page.
+
+        :return list: items
+
+        """
+        if self._page is None:
+            ordering = self.ordering
+            direction, values = self.decode(
+                self.query_dict.get('cursor'), ordering, self.queryset.model)
+            backward = direction == 'prev'
+
+            queryset = self.queryset
+            if values:
+                queryset = queryset.filter(
+                    self.get_filter(ordering, values, backward))
+
+            queryset = queryset.order_by(*(
+                ('-' if desc != backward else '') + name
+                for name, desc in ordering))
+
+            items = list(queryset[:self.per_page + 1])
+            more = len(items) > self.per_page
+            items = items[:self.per_page]
+
+            if backward:
+                items.reverse()
+                self.has_next, self.has_previous = True, more
+            else:
+                self.has_next, self.has_previous = more, bool(values)
+
+            self._page = items
+
+        return self._page
+
+    @property
+    def page_number(self):
+        """ Pages are not numbered.
+
+        :return None:
+
+        """
+        return None
+
+    @property
+    def count(self):
+        """ Collection is not counted.
+
+        :return None:
+
+        """
+        return None
+
+    @property
+    def resources(self):
+        """ Return list of current page resources.
+
+        :return list:
+
+        """
+        return self.page
+
+    @property
+    def next_page(self):
+        """ Return URL for next page.
+
+        :return str:
+
+        """
+        if self.page and self.has_next:
+            return self.get_url('next', self.page[-1])
+        return ""
+
+    @property
+    def previous_page(self):
+        """ Return URL for previous page.
+
+        :return str:
+
+        """
+        if self.page and self.has_previous:
+            return self.get_url('prev', self.page[0])
+        return ""
+
+    def get_url(self, direction, item):
+        """ Make URL with a cursor from the item.
+
+        :return str:
+
+        """
+        ordering = self.ordering
+        values = []
+        for name, _ in ordering:
+            value = item
+            for attr in name.split(LOOKUP_SEP):
+                value = getattr(value, attr)
+            if isinstance(value, Model):
+                value = value.pk
+            values.append(smart_unicode(value))
+
+        self.query_dict['cursor'] = urlsafe_b64encode(backend.dumps(
+            [direction, [name for name, _ in ordering], values]))
+        return "%s?%s" % (self.path, urlencode(self.query_dict))
+
+    @staticmethod
+    def decode(cursor, ordering, model):
+        """ Parse cursor. Values are converted by the model's fields.
+
+        :return tuple: (direction, values)
+
+        """
+        if not cursor:
+            return 'next', None
+
+        try:
+            direction, names, values = backend.loads(
+                urlsafe_b64decode(str(cursor)))
+            assert direction in ('next', 'prev')
+            assert names == [name for name, _ in ordering]
+            assert len(values) == len(names)
+            values = [
+                to_python(model, name, value)
+                for name, value in zip(names, values)]
+        except (TypeError, ValueError, AssertionError, ValidationError):
+            raise HttpError("Invalid cursor", status=HTTP_400_BAD_REQUEST)
+
+        return direction, values
+
+    @staticmethod
+    def get_filter(ordering, values, backward=False):
+        """ Make a filter for items after (before) the values.
+
+        :return Q: filter
+
+        """
+        keyset = None
+        for n, (name, desc) in enumerate(ordering):
+            q = Q(**{'%s__%s' % (name, 'lt' if desc != backward else 'gt'):
+                     values[n]})
+            for (prev, _), value in zip(ordering[:n], values[:n]):
+                q &= Q(**{prev: value})
+            keyset = q if keyset is None else keyset | q
+
+        # Help database to use an index of the first column
+        name, desc = ordering[0]
+        return Q(**{'%s__%s' % (name, 'lte' if desc != backward else 'gte'):
+                    values[0]}) & keyset
+
+
+def to_python(model, path, value):
+    """ Convert a cursor's value by the field of the model's path.
+
+    Values of relations are primary keys. Values of unknown fields (extra
+    selects and etc) are not converted.
+
+    :return object: value
+
+    """
+    field, opts = None, model._meta
+    try:
+        for name in path.split(LOOKUP_SEP):
+            field = opts.pk if name == 'pk' else opts.get_field(name)
+            if field.rel:
+                opts = field.rel.to._meta
+                field = field.rel.get_related_field()
+    except FieldDoesNotExist:
+        return value
+
+    return field.to_python(value)
@@ -1,12 +1,14 @@
 import abc
-import json as js
 
 from .exceptions import HttpError
+from .jsonlib import backend
 from .status import HTTP_400_BAD_REQUEST
 from .tools import FrozenDict
 
 
-__all__ = 'FormParser', 'JSONParser', 'RawParser', 'XMLParser', 'AbstractParser'
+__all__ = (
+    'FormParser', 'JSONParser', 'NDJSONParser', 'RawParser', 'XMLParser',
+    'AbstractParser')
 
 
 class AbstractParser(object):
@@ -55,13 +57,64 @@ class JSONParser(AbstractParser):
     @staticmethod
     def parse(request):
         try:
-            return js.loads(request.body)
+            return backend.loads(request.body)
         except ValueError, e:
             raise HttpError('JSON parse error - %s'.format(e),
                             status=HTTP_400_BAD_REQUEST)
 
 
+class NDJSONParser(AbstractParser):
+
+    """ Parse a list of items from newline delimited JSON.
+
+    Every non-empty line is an item.
+
+    """
+
+    media_type = 'application/x-ndjson'
+
+    @staticmethod
+    def parse(request):
+        items = []
+        for n, line in enumerate(request.body.splitlines(), 1):
+            if not line.strip():
+                continue
+            try:
+                items.append(backend.loads(line))
+            except ValueError, e:
+                raise HttpError('NDJSON parse error (line %s) - %s' % (n, e),
+                                status=HTTP_400_BAD_REQUEST)
+        return items
+
+
 class XMLParser(RawParser):
     " Parse user data from XML. "
 
     media_type = 'application/xml'
+
+
+try:
+    import msgpack
+
+    class MsgPackParser(AbstractParser):
+
+        """ Parse user data from MessagePack.
+
+        Require `msgpack` package.
+
+        """
+
+        media_type = 'application/x-msgpack'
+
+        @staticmethod
+        def parse(request):
+            try:
+                return msgpack.unpackb(request.body, raw=False)
+            except ValueError, e:
+                raise HttpError('MessagePack parse error - %s' % e,
+                                status=HTTP_400_BAD_REQUEST)
+
+    __all__ += 'MsgPackParser',
+
+except ImportError:
+    pass
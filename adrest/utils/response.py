@@ -1,4 +1,5 @@
 from django.http import HttpResponse
+from django.http.response import HttpResponseBase
 
 from .status import HTTP_200_OK
 
@@ -8,7 +9,7 @@ class SerializedMeta(type):
     def __call__(cls, content, *args, **kwargs):
         """ Don't create clones.
         """
-        if isinstance(content, HttpResponse):
+        if isinstance(content, HttpResponseBase):
             return content
 
         return super(SerializedMeta, cls).__call__(
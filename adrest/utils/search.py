@@ -0,0 +1,267 @@
+""" Full-text search indexes.
+
+Index is selected by vendor of model's database. Only SQLite (FTS5) is
+supported now, subclass :class:`SearchIndex` and register it in `BACKENDS`
+for other databases.
+
+"""
+import re
+from hashlib import md5
+
+from django.db import connections, router
+from django.db.models.signals import post_save, post_delete
+from django.utils.encoding import force_text
+
+from .tools import atomic
+
+
+__all__ = 'SearchIndex', 'SQLiteSearchIndex', 'get_index', 'has_index'
+
+
+#: Registered indexes: {model: [index, ...]}
+INDEXES = dict()
+
+#: Words of search query
+WORDS = re.compile(r'\w+\*?', re.UNICODE)
+
+
+class SearchIndex(object):
+
+    """ Full-text index of model's fields.
+
+    Index is updated when an instance is saved or deleted. Bulk operations
+    (`QuerySet.update`, `bulk_create`) do not send signals, rebuild indexes
+    after them with `manage.py adrest_search`.
+
+    """
+
+    vendor = None
+
+    def __init__(self, model, fields):
+        self.model = model
+        self.fields = [model._meta.get_field(name) for name in fields]
+        self.table = '%s_search_%s' % (model._meta.db_table, md5(
+            ':'.join(sorted(fields))).hexdigest()[:8])
+        INDEXES.setdefault(model, []).append(self)
+
+    def __repr__(self):
+        return "<%s %s (%s)>" % (
+            self.__class__.__name__, self.model._meta,
+            ', '.join(f.name for f in self.fields))
+
+    def search(self, queryset, query):
+        """ Filter the queryset by search query.
+
+        :return queryset: queryset
+
+        """
+        raise NotImplementedError
+
+    def update(self, instance, using=None):
+        """ Index saved instance. """
+        raise NotImplementedError
+
+    def remove(self, instance, using=None):
+        """ Remove deleted instance from the index. """
+        raise NotImplementedError
+
+    def rebuild(self, using=None, chunk=1000):
+        """ Index all of model's instances.
+
+        :return int: number of indexed instances
+
+        """
+        raise NotImplementedError
+
+
+class SQLiteSearchIndex(SearchIndex):
+
+    """ Index stored in SQLite FTS5 virtual table.
+
+    Rows of the index are keyed by primary key (`rowid`), so primary keys
+    should be integers. Table is created on demand.
+
+    """
+
+    vendor = 'sqlite'
+
+    def __init__(self, model, fields):
+        if model._meta.pk.get_internal_type() not in (
+                'AutoField', 'IntegerField', 'BigIntegerField',
+                'PositiveIntegerField'):
+            raise AssertionError(
+                "Full-text search requires integer primary key: %s" %
+                model._meta)
+        super(SQLiteSearchIndex, self).__init__(model, fields)
+
+        #: Aliases of databases where the table is created
+        self.created = set()
+
+    def search(self, queryset, query):
+        """ Filter the queryset by words of query.
+
+        Words are joined by AND, a word which ends with `*` is a prefix.
+        Query's syntax of FTS5 is not exposed to clients.
+
+        :return queryset: queryset
+
+        """
+        words = [
+            '"%s"%s' % (w.rstrip('*'), '*' if w.endswith('*') else '')
+            for w in WORDS.findall(query) if w.rstrip('*')]
+        if not words:
+            return queryset.none()
+
+        connection = connections[queryset.db]
+        self.create(connection)
+
+        qn = connection.ops.quote_name
+        return queryset.extra(
+            where=["%s.%s IN (SELECT rowid FROM %s WHERE %s MATCH %%s)" % (
+                qn(self.model._meta.db_table), qn(self.model._meta.pk.column),
+                qn(self.table), qn(self.table))],
+            params=[' '.join(words)])
+
+    def update(self, instance, using=None):
+        """ Index saved instance. """
+        connection = self.get_connection(instance, using)
+        self.create(connection)
+        connection.cursor().execute(self.get_insert(), self.get_row(
+            [instance._get_pk_val()] +
+            [getattr(instance, f.attname) for f in self.fields]))
+
+    def remove(self, instance, using=None):
+        """ Remove deleted instance from the index. """
+        connection = self.get_connection(instance, using)
+        self.create(connection)
+        connection.cursor().execute(
+            "DELETE FROM %s WHERE rowid = %%s" % self.quote(self.table),
+            [instance._get_pk_val()])
+
+    def rebuild(self, using=None, chunk=1000):
+        """ Index all of model's instances by primary key's ranges.
+
+        :return int: number of indexed instances
+
+        """
+        using = using or router.db_for_write(self.model)
+        queryset = self.model._default_manager.using(using).order_by(
+            'pk').values_list('pk', *(f.name for f in self.fields))
+
+        count, last = 0, None
+        with atomic(using=using):
+            self.create(connections[using])
+            cursor = connections[using].cursor()
+            cursor.execute("DELETE FROM %s" % self.quote(self.table))
+
+            while True:
+                rows = list((queryset if last is None else queryset.filter(
+                    pk__gt=last))[:chunk])
+                if not rows:
+                    break
+
+                cursor.executemany(
+                    self.get_insert(), [self.get_row(r) for r in rows])
+                count, last = count + len(rows), rows[-1][0]
+
+        return count
+
+    def create(self, connection):
+        """ Create the index's table if it does not exist.
+
+        Existence is checked first: sqlite commits a pending transaction
+        before DDL statements in Django < 1.6. Tables are remembered by
+        database's aliases when they could not be rolled back (outside of
+        atomic blocks).
+
+        """
+        if connection.alias in self.created:
+            return
+
+        cursor = connection.cursor()
+        cursor.execute(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = %s",
+            [self.table])
+        if not cursor.fetchone():
+            cursor.execute(
+                "CREATE VIRTUAL TABLE IF NOT EXISTS %s USING fts5(%s)" % (
+                    self.quote(self.table),
+                    ', '.join(self.quote(f.name) for f in self.fields)))
+
+        if not getattr(connection, 'in_atomic_block', False):
+            self.created.add(connection.alias)
+
+    def get_insert(self):
+        return "INSERT OR REPLACE INTO %s (rowid, %s) VALUES (%s)" % (
+            self.quote(self.table),
+            ', '.join(self.quote(f.name) for f in self.fields),
+            ', '.join(['%s'] * (len(self.fields) + 1)))
+
+    @staticmethod
+    def get_row(values):
+        return [values[0]] + [
+            None if v is None else force_text(v) for v in values[1:]]
+
+    def get_connection(self, instance, using=None):
+        return connections[
+            using or router.db_for_write(self.model, instance=instance)]
+
+    def quote(self, name):
+        return connections[router.db_for_read(self.model)].ops.quote_name(
+            name)
+
+
+#: Indexes by database's vendor
+BACKENDS = dict((b.vendor, b) for b in (SQLiteSearchIndex,))
+
+
+def get_index(model, fields):
+    """ Get full-text index of the model's fields.
+
+    Resources with same fields share an index.
+
+    :return SearchIndex: index
+
+    """
+    fields = tuple(fields)
+    for index in INDEXES.get(model, ()):
+        if tuple(f.name for f in index.fields) == fields:
+            return index
+
+    vendor = connections[router.db_for_read(model)].vendor
+    if vendor not in BACKENDS:
+        raise AssertionError(
+            "Full-text search is not supported for '%s' database." % vendor)
+
+    return BACKENDS[vendor](model, fields)
+
+
+def has_index(model):
+    """ Check the model has full-text indexes (updated by signals).
+
+    :return bool:
+
+    """
+    return bool(INDEXES.get(model))
+
+
+def update(sender, instance, using=None, **kwargs):
+    """ Update indexes of saved instance. """
+    if getattr(sender, '_deferred', False):
+        sender = sender._meta.proxy_for_model
+
+    for index in INDEXES.get(sender, ()):
+        index.update(instance, using)
+
+
+def remove(sender, instance, using=None, **kwargs):
+    """ Remove deleted instance from indexes. """
+    if getattr(sender, '_deferred', False):
+        sender = sender._meta.proxy_for_model
+
+    for index in INDEXES.get(sender, ()):
+        index.remove(instance, using)
+
+
+post_save.connect(update, dispatch_uid='adrest.utils.search')
+post_delete.connect(remove, dispatch_uid='adrest.utils.search')
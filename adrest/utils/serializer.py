@@ -1,30 +1,370 @@
 """ ADRest serializers. """
 import collections
+import csv
 import inspect
+from cStringIO import StringIO
+from hashlib import md5
+from itertools import chain
 from numbers import Number
 from datetime import datetime, date, time
 from decimal import Decimal
+from types import InstanceType
+from xml.sax.saxutils import escape
 
 from django.db.models import Model, Manager
-from django.utils.encoding import smart_unicode
-import json as js
-
+from django.db.models.fields import FieldDoesNotExist
+from django.db.models.fields.related import ManyToManyRel
+from django.db.models.query import (
+    QuerySet, ValuesQuerySet, prefetch_related_objects)
+from django.utils.encoding import smart_unicode, smart_str
+from .jsonlib import backend
 from .tools import as_tuple
 
 
-__all__ = 'JSONSerializer', 'XMLSerializer', 'BaseSerializer'
+__all__ = (
+    'JSONSerializer', 'ColumnsJSONSerializer', 'CSVSerializer',
+    'XMLSerializer', 'BaseSerializer')
+
+
+#: Names of model options
+OPTIONS = 'fields', 'include', 'exclude', 'related'
+
+#: Kinds of model plan's fields
+HOOK, FIELD, ATTR = range(3)
+
+# Separator of flattened names
+LOOKUP_SEP = '__'
+
+#: Cache of compiled model plans
+PLANS = dict()
+PLANS_LIMIT = 1000
+
+#: Cache of resolved handlers: {serializer class: {type: handler}}
+DISPATCH = dict()
+
+NoneType = type(None)
+
+
+def simple_self(serializer, value, **options):
+    return value
+
+
+def simple_string(serializer, value, **options):
+    return smart_unicode(value)
+
+
+def simple_decimal(serializer, value, **options):
+    return float(str(value))
+
+
+def simple_datetime(serializer, value, **options):
+    return serializer.to_simple_datetime(value)
+
+
+def simple_mapping(serializer, value, **options):
+    return dict(
+        (k, serializer.to_simple(v, **options)) for k, v in value.items())
+
+
+def simple_iterable(serializer, value, **options):
+    return [serializer.to_simple(o, **options) for o in value]
+
+
+def simple_protocol(serializer, value, **options):
+    return serializer.to_simple(value.to_simple(serializer), **options)
+
+
+def simple_model(serializer, value, **options):
+    if serializer.cache is not None:
+        return serializer.to_simple_cached(value, **options)
+    return serializer.to_simple_model(value, **options)
+
+
+def simple_queryset(serializer, value, **options):
+    return list(serializer.iter_queryset(value, **options))
+
+
+def simple_str(serializer, value, **options):
+    # Instance's attributes are not visible by the class
+    if hasattr(value, 'to_simple') and not inspect.isclass(value):
+        return simple_protocol(serializer, value, **options)
+
+    if isinstance(value, Model):
+        return simple_model(serializer, value, **options)
+
+    return str(value)
+
+
+def simple_instance(serializer, value, **options):
+    handler = serializer.resolve(value.__class__)
+    return handler(serializer, value, **options)
+
+
+def freeze_options(options):
+    """ Make a hashable key from normalized model options.
+
+    :return tuple: frozen options
+
+    """
+    return (
+        frozenset(options['fields']),
+        frozenset(options['include']),
+        frozenset(options['exclude']),
+        tuple(sorted(
+            (name, freeze_options(BaseSerializer.init_options(**related)))
+            for name, related in options['related'].items() if related
+        )),
+    )
+
+
+def get_digest(model, options, scheme=None, format='django'):
+    """ Make a digest of serialization's options.
+
+    Digest does not depend on a process and is used in cache's keys.
+
+    :return str: hex digest
+
+    """
+    def stable(frozen):
+        fields, include, exclude, related = frozen
+        return (
+            sorted(smart_str(f) for f in fields),
+            sorted(smart_str(f) for f in include),
+            sorted(smart_str(f) for f in exclude),
+            [(smart_str(name), stable(r)) for name, r in related],
+        )
+
+    if scheme is not None and not inspect.isclass(scheme):
+        scheme = type(scheme)
+
+    return md5(repr((
+        smart_str(model._meta),
+        stable(freeze_options(BaseSerializer.init_options(**options))),
+        scheme and '%s.%s' % (scheme.__module__, scheme.__name__),
+        format,
+    ))).hexdigest()
+
+
+def get_fieldset(model, options):
+    """ Get names of the model's serialized fields.
+
+    :return set: field's names
+
+    """
+    options = BaseSerializer.init_options(**options)
+    return options['fields'] or (set(
+        f.name for f in model._meta.fields if f.serialize) |
+        options['include']) - options['exclude']
+
+
+def get_relations(model, options, scheme=None):
+    """ Find relations which will be loaded by serialization of the model.
+
+    Foreign keys with related options should be selected, many-to-many and
+    reverse relations should be prefetched. Fields calculated by scheme's
+    `to_simple__<name>` are skipped.
+
+    :return tuple: (select_related lookups, prefetch_related lookups)
+
+    """
+    options = BaseSerializer.init_options(**options)
+    fields = dict((f.name, f) for f in model._meta.fields)
+
+    select, prefetch = [], []
+    for fname in sorted(get_fieldset(model, options)):
+
+        if getattr(scheme, 'to_simple__{0}'.format(fname), None):
+            continue
+
+        related = options['related'].get(fname) or dict()
+
+        if fname in fields:
+            field = fields[fname]
+
+            # Only a primary key is serialized
+            if not field.rel or not related:
+                continue
+
+            nested_select, nested_prefetch = get_relations(
+                field.rel.to, related, scheme)
+            select.append(fname)
+            select += ['%s__%s' % (fname, n) for n in nested_select]
+            prefetch += ['%s__%s' % (fname, n) for n in nested_prefetch]
+            continue
+
+        rel_model = get_many_related_model(model, fname)
+        if rel_model:
+            nested_select, nested_prefetch = get_relations(
+                rel_model, related, scheme)
+            prefetch.append(fname)
+            prefetch += ['%s__%s' % (fname, n)
+                         for n in nested_select + nested_prefetch]
+
+    return select, prefetch
+
+
+def get_many_related_model(model, name):
+    """ Get a model of many-to-many or reverse relation by accessor's name.
+
+    :return Model: related model or None
+
+    """
+    for field in model._meta.many_to_many:
+        if field.name == name:
+            return field.rel.to
+
+    for rel in model._meta.get_all_related_objects() + \
+            model._meta.get_all_related_many_to_many_objects():
+        if rel.get_accessor_name() == name:
+            return rel.model
+
+    return None
+
+
+def to_columns(items):
+    """ Convert a list of mappings with the same keys to columns.
+
+    Other lists are returned as is.
+
+    :return dict: {'columns': [names], 'rows': [[values], ...]}
+
+    """
+    if not all(isinstance(item, dict) for item in items):
+        return items
+
+    columns = sorted(items[0]) if items else []
+    size = len(columns)
+    if any(len(item) != size or not all(c in item for c in columns)
+           for item in items):
+        return items
+
+    return dict(
+        columns=columns, rows=[[item[c] for c in columns] for item in items])
+
+
+def is_builtin(field):
+    """ Check the field is provided by Django.
+
+    Custom fields could convert values from database by their own way.
+
+    :return bool:
+
+    """
+    return type(field).__module__.startswith('django.')
+
+
+def iterate(queryset, chunk_size=100):
+    """ Iterate a queryset with `iterator()`.
+
+    Prefetched relations are loaded by chunks.
+
+    :return generator: instances
+
+    """
+    lookups = queryset._prefetch_related_lookups
+    if not lookups:
+        for instance in queryset.iterator():
+            yield instance
+        return
+
+    chunk = []
+    for instance in queryset.iterator():
+        chunk.append(instance)
+        if len(chunk) == chunk_size:
+            prefetch_related_objects(chunk, lookups)
+            for o in chunk:
+                yield o
+            chunk = []
+
+    prefetch_related_objects(chunk, lookups)
+    for o in chunk:
+        yield o
+
+
+class ModelPlan(object):
+
+    """ Compiled serialization plan for a model.
+
+    Plan is an ordered and immutable tuple of fields. Every field is
+    described as `(name, kind, accessor, related options)` where kind is:
+
+    * HOOK -- value is calculated by scheme's `to_simple__<name>`;
+    * FIELD -- value is taken from a concrete model field;
+    * ATTR -- value is taken from instance's attribute (relations, properties).
+
+    When all of fields are Django's concrete fields, plan has `columns` for
+    serialization of querysets from `values_list()` rows.
+
+    Plan's `digest` identifies serialization's options in cache's keys.
+
+    """
+
+    __slots__ = 'model', 'label', 'fields', 'columns', 'digest'
+
+    def __init__(self, model, options, scheme=None, format='django'):
+        self.model = model
+        self.label = smart_unicode(model._meta)
+        self.digest = get_digest(model, options, scheme, format)
+
+        default_fields = [f.name for f in model._meta.fields if f.serialize]
+        serialized_fields = options['fields'] or (
+            set(default_fields) | options['include']) - options['exclude']
+        ordered = [f for f in default_fields if f in serialized_fields] + \
+            sorted(set(serialized_fields) - set(default_fields))
+
+        fields = []
+        for fname in ordered:
+
+            hook = 'to_simple__{0}'.format(fname)
+            if getattr(scheme, hook, None):
+                fields.append((fname, HOOK, hook, None))
+                continue
+
+            related = options['related'].get(fname)
+            if related:
+                related = BaseSerializer.init_options(**related)
+
+            if fname in default_fields and not related:
+                field = model._meta.get_field(fname)
+                fields.append((fname, FIELD, field.value_from_object, None))
+
+            else:
+                fields.append((fname, ATTR, fname, related or dict()))
+
+        self.fields = tuple(fields)
+
+        # Plain columns could be read without model's instances
+        self.columns = None
+        if all(kind is FIELD and is_builtin(model._meta.get_field(fname))
+               for fname, kind, _, _ in fields):
+            pk = model._meta.pk.name
+            self.columns = (pk,) + tuple(
+                fname for fname, _, _, _ in fields if fname != pk)
+
+    def __repr__(self):
+        return "<ModelPlan %s>" % self.label
 
 
 class BaseSerializer(object):
 
     """ Abstract class for serializers. """
 
-    def __init__(
-            self, scheme=None, options=None, format='django', **model_options):
+    #: Registered converters for custom types: ((types, converter), ...)
+    #: Converters of parent classes are used too.
+    converters = tuple()
+
+    #: Number of collection's items per a streamed chunk
+    chunk_size = 100
+
+    def __init__(self, scheme=None, options=None, format='django',
+                 cache=None, **model_options):
         self.scheme = scheme
         self.format = format
+        self.cache = cache
         self.serializer_options = options or dict()
         self.model_options = self.init_options(**model_options)
+        self.dispatch = DISPATCH.setdefault(self.__class__, dict())
+        self.__plans = dict()
 
     @staticmethod
     def init_options(fields=None, include=None, exclude=None, related=None):
@@ -36,41 +376,86 @@ class BaseSerializer(object):
         )
         return options
 
-    def to_simple(self, value, **options):  # nolint
+    @classmethod
+    def register(cls, types, converter):
+        """ Register a converter for custom types.
+
+        Converter is called as `converter(value, serializer=serializer)` and
+        should return a simple python structure. ::
+
+            BaseSerializer.register(UUID, lambda v, serializer=None: v.hex)
+
+        """
+        cls.converters = cls.__dict__.get('converters', tuple()) + (
+            (types, converter),)
+        for handlers in DISPATCH.values():
+            handlers.clear()
+
+    def to_simple(self, value, **options):
         " Simplify object. "
 
+        # Proxies (like `SimpleLazyObject`) fake `__class__`
+        cls = value.__class__
+        try:
+            handler = self.dispatch[cls]
+        except KeyError:
+            handler = self.dispatch[cls] = self.resolve(cls)
+
+        return handler(self, value, **options)
+
+    def resolve(self, cls):  # nolint
+        """ Find a handler for the type.
+
+        Resolution is made once per type, the result is cached in
+        `serializer.dispatch`.
+
+        :return function: handler
+
+        """
+        # Old-style instances share the one type
+        if cls is InstanceType:
+            return simple_instance
+
+        for klass in type(self).__mro__:
+            for types, converter in klass.__dict__.get('converters', ()):
+                if issubclass(cls, types):
+                    return lambda s, v, **o: converter(v, serializer=s)
+
         # (string, unicode)
-        if isinstance(value, basestring):
-            return smart_unicode(value)
+        if issubclass(cls, basestring):
+            return simple_string
 
         # (int, long, float, real, complex, decimal)
-        if isinstance(value, Number):
-            return float(str(value)) if isinstance(value, Decimal) else value
+        if issubclass(cls, Number):
+            return simple_decimal if issubclass(cls, Decimal) else simple_self
 
         # (datetime, data, time)
-        if isinstance(value, (datetime, date, time)):
-            return self.to_simple_datetime(value)
+        if issubclass(cls, (datetime, date, time)):
+            return simple_datetime
+
+        # (QuerySet, ValuesQuerySet)
+        if issubclass(cls, QuerySet):
+            return simple_queryset
 
         # (dict, ordereddict, mutable mapping)
-        if isinstance(value, collections.MutableMapping):
-            return dict(
-                (k, self.to_simple(v, **options)) for k, v in value.items())
+        if issubclass(cls, collections.MutableMapping):
+            return simple_mapping
 
         # (tuple, list, set, iterators)
-        if isinstance(value, collections.Iterable):
-            return [self.to_simple(o, **options) for o in value]
+        if issubclass(cls, collections.Iterable):
+            return simple_iterable
 
         # (None, True, False)
-        if value is None or value is True or value is False:
-            return value
+        if cls in (NoneType, bool):
+            return simple_self
 
-        if hasattr(value, 'to_simple') and not inspect.isclass(value):
-            return self.to_simple(value.to_simple(self), **options)
+        if hasattr(cls, 'to_simple') and not issubclass(cls, type):
+            return simple_protocol
 
-        if isinstance(value, Model):
-            return self.to_simple_model(value, **options)
+        if issubclass(cls, Model):
+            return simple_model
 
-        return str(value)
+        return simple_str
 
     @staticmethod
     def to_simple_datetime(value):
@@ -84,54 +469,192 @@ class BaseSerializer(object):
             result = result[:12]
         return result
 
-    def to_simple_model(self, instance, **options): # noqa
-        """ Convert model to simple python structure.
+    def iter_queryset(self, queryset, chunked=False, **options):
+        """ Iterate simplified items of the queryset.
+
+        Querysets of plain columns are read with `values_list()` and model's
+        instances are not created.
+
+        :param chunked: Read the queryset with `iterator()`
+
+        :return generator: simplified items
+
         """
-        options = self.init_options(**options)
-        fields, include, exclude, related = options['fields'], options['include'], options['exclude'], options['related'] # noqa
+        if not isinstance(queryset, ValuesQuerySet) and \
+                queryset._result_cache is None:
+            plan, _ = self.get_plan(queryset.model, options)
+            if self.cache is not None and self.cache.model is plan.model:
+                return self.iter_cached(queryset, plan, options)
+
+            if plan.columns:
+                rows = queryset.values_list(*plan.columns)
+                if chunked:
+                    rows = rows.iterator()
+                return (self.to_simple_row(plan, row) for row in rows)
+
+        if chunked:
+            queryset = iterate(queryset, self.chunk_size)
+        return (self.to_simple(o, **options) for o in queryset)
+
+    def iter_cached(self, queryset, plan, options):
+        """ Iterate simplified items of the queryset with the cache.
+
+        Primary keys and versions are read by one query, cached items are
+        loaded by `get_many`. Only missed items are serialized.
+
+        :return generator: simplified items
+
+        """
+        cache = self.cache
+        cache.register(plan.digest)
 
+        columns = (plan.model._meta.pk.name,)
+        if cache.version:
+            columns += (cache.version,)
+
+        rows = list(queryset.values_list(*columns))
+        keys = [
+            cache.get_key(row[0], row[1] if cache.version else None,
+                          plan.digest) for row in rows]
+        cached = cache.get_many(keys)
+
+        missed = dict(
+            (row[0], key) for row, key in zip(rows, keys) if key not in cached)
+        if missed:
+            queryset = queryset._clone()
+            queryset.query.clear_limits()
+            queryset = queryset.filter(pk__in=list(missed))
+
+            if plan.columns:
+                items = (
+                    (row[0], self.to_simple_row(plan, row))
+                    for row in queryset.values_list(*plan.columns))
+            else:
+                items = (
+                    (o._get_pk_val(), self.to_simple_model(o, **options))
+                    for o in queryset)
+
+            fresh = dict((missed[pk], simple) for pk, simple in items)
+            cache.set_many(fresh)
+            cached.update(fresh)
+
+        return (cached[key] for key in keys if key in cached)
+
+    def to_simple_cached(self, instance, **options):
+        """ Convert model to simple python structure with the cache.
+
+        :return dict: simplified instance
+
+        """
+        plan, _ = self.get_plan(instance.__class__, options)
+        cache = self.cache
+        if cache.model is not plan.model:
+            return self.to_simple_model(instance, **options)
+
+        cache.register(plan.digest)
+        key = cache.get_key(
+            instance._get_pk_val(), cache.get_version(instance), plan.digest)
+        simple = cache.get(key)
+        if simple is None:
+            simple = self.to_simple_model(instance, **options)
+            cache.set(key, simple)
+
+        return simple
+
+    def to_simple_row(self, plan, row):
+        """ Convert `values_list()` row to simple python structure.
+
+        Result is same as :meth:`to_simple_model` returns for an instance.
+
+        """
+        values = dict(zip(plan.columns, row))
         result = dict(
-            model=smart_unicode(instance._meta),
-            pk=smart_unicode(
-                instance._get_pk_val(), strings_only=True),
-            fields=dict(),
-        )
+            (fname, self.to_simple(values[fname]))
+            for fname, _, _, _ in plan.fields)
+        pk = smart_unicode(row[0], strings_only=True)
+
+        if self.format != 'django':
+            result['id'] = pk
+            return result
 
-        default_fields = set([field.name for field in instance._meta.fields if field.serialize])
-        serialized_fields = fields or (default_fields | include) - exclude
+        return dict(model=plan.label, pk=pk, fields=result)
 
-        for fname in serialized_fields:
+    def to_simple_model(self, instance, **options):
+        """ Convert model to simple python structure.
 
-            # Respect `to_simple__<fname>`
-            to_simple = getattr(
-                self.scheme, 'to_simple__{0}'.format(fname), None)
+        Use a compiled serialization plan (see :class:`ModelPlan`).
 
-            if to_simple:
-                result['fields'][fname] = to_simple(instance, serializer=self)
-                continue
+        """
+        plan, fields = self.get_plan(instance.__class__, options)
 
-            related_options = related.get(fname, dict())
-            if related_options:
-                related_options = self.init_options(**related_options)
+        result = dict()
+        for fname, kind, accessor, related in fields:
 
-            if fname in default_fields and not related_options:
-                field = instance._meta.get_field(fname)
-                value = field.value_from_object(instance)
+            # Respect `to_simple__<fname>`
+            if kind is HOOK:
+                result[fname] = accessor(instance, serializer=self)
+
+            elif kind is FIELD:
+                result[fname] = self.to_simple(accessor(instance))
 
             else:
-                value = getattr(instance, fname, None)
+                value = getattr(instance, accessor, None)
                 if isinstance(value, Manager):
                     value = value.all()
+                result[fname] = self.to_simple(value, **related)
 
-            result['fields'][fname] = self.to_simple(
-                value, **related_options)
+        pk = smart_unicode(instance._get_pk_val(), strings_only=True)
 
         if self.format != 'django':
-            fields = result['fields']
-            fields['id'] = result['pk']
-            result = fields
+            result['id'] = pk
+            return result
 
-        return result
+        return dict(model=plan.label, pk=pk, fields=result)
+
+    def get_plan(self, model, options):
+        """ Get a compiled plan for the model and the given options.
+
+        Plans are shared between serializers and keyed by model, options,
+        scheme's class and format. Hooks from the scheme are resolved once
+        per serializer.
+
+        :return tuple: (plan, fields with resolved hooks)
+
+        """
+        values = tuple(options.get(name) for name in OPTIONS)
+        key = (model,) + tuple(id(v) for v in values)
+        try:
+            return self.__plans[key][0]
+        except KeyError:
+            pass
+
+        # Use original models for deferred models (`QuerySet.only`)
+        if getattr(model, '_deferred', False):
+            model = model._meta.proxy_for_model
+
+        options = self.init_options(**options)
+        scheme = self.scheme if inspect.isclass(self.scheme) \
+            else type(self.scheme)
+        plan_key = model, freeze_options(options), scheme, self.format
+
+        plan = PLANS.get(plan_key)
+        if plan is None:
+
+            # Options could be changed by clients (sparse fieldsets)
+            if len(PLANS) >= PLANS_LIMIT:
+                PLANS.clear()
+
+            plan = PLANS[plan_key] = ModelPlan(
+                model, options, self.scheme, self.format)
+
+        fields = tuple(
+            (fname, kind, getattr(self.scheme, accessor), related)
+            if kind is HOOK else (fname, kind, accessor, related)
+            for fname, kind, accessor, related in plan.fields)
+
+        # Keep option's values alive for their ids stay unique
+        self.__plans[key] = (plan, fields), values
+        return plan, fields
 
     def serialize(self, value):
         simple = self.to_simple(value, **self.model_options)
@@ -146,49 +669,432 @@ class JSONSerializer(BaseSerializer):
 
     def serialize(self, value):
         simple = super(JSONSerializer, self).serialize(value)
-        return js.dumps(simple, **self.serializer_options)
+        return backend.dumps(simple, **self.serializer_options)
+
+    def stream(self, value):
+        """ Serialize to JSON by chunks.
+
+        QuerySets are read with `iterator()` and every item is serialized as
+        it comes. Scheme's `to_simple` hook is not applied.
+
+        :return generator: JSON chunks
+
+        """
+        return self._stream(value, self.model_options)
+
+    def _stream(self, value, options):  # nolint
+        item_sep, key_sep = self.serializer_options.get(
+            'separators', (', ', ': '))
+
+        try:
+            handler = self.dispatch[type(value)]
+        except KeyError:
+            handler = self.dispatch[type(value)] = self.resolve(type(value))
+
+        if handler is simple_protocol:
+            for chunk in self._stream(value.to_simple(self), options):
+                yield chunk
+
+        elif handler is simple_mapping:
+            items = value.items()
+            if self.serializer_options.get('sort_keys'):
+                items = sorted(items)
+
+            yield '{'
+            for n, (k, v) in enumerate(items):
+                yield (item_sep if n else '') + backend.dumps(
+                    smart_unicode(k)) + key_sep
+                for chunk in self._stream(v, options):
+                    yield chunk
+            yield '}'
+
+        elif handler is simple_iterable or handler is simple_queryset:
+            if handler is simple_queryset:
+                items = (
+                    (backend.dumps(o, **self.serializer_options),)
+                    for o in self.iter_queryset(value, True, **options))
+            else:
+                items = (self._stream(o, options) for o in value)
+
+            chunk = ['[']
+            for n, item in enumerate(items):
+                if n:
+                    chunk.append(item_sep)
+                chunk.extend(item)
+
+                if n % self.chunk_size == self.chunk_size - 1:
+                    yield ''.join(chunk)
+                    chunk = []
+
+            chunk.append(']')
+            yield ''.join(chunk)
+
+        else:
+            yield backend.dumps(
+                handler(self, value, **options), **self.serializer_options)
+
+
+class ColumnsJSONSerializer(JSONSerializer):
+
+    """ Serialize collections of models to JSON columns. ::
+
+        {"columns": ["id", "name"], "rows": [[1, "Jack"], [2, "Bill"]]}
+
+    Paginated resources are serialized the same way. Collections of
+    different items are serialized as is.
+
+    """
+
+    def serialize(self, value):
+        simple = super(JSONSerializer, self).serialize(value)
+
+        if isinstance(simple, list):
+            simple = to_columns(simple)
+
+        elif isinstance(simple, dict) and \
+                isinstance(simple.get('resources'), list):
+            simple['resources'] = to_columns(simple['resources'])
+
+        return backend.dumps(simple, **self.serializer_options)
+
+
+class CSVSerializer(BaseSerializer):
+
+    """ Serialize collections to CSV. Every item is a row. ::
+
+        id,name,author__id,author__name
+        1,War and Peace,1,Leo Tolstoy
+
+    Columns are taken from the model's serialization plan (`id` first), so
+    every row has the same shape. Related models with options are expanded
+    to columns with `__` names by their plans, lists are written as JSON.
+    Scheme's `to_simple` hook is not applied to streamed collections.
+
+    """
+
+    def __init__(self, scheme=None, options=None, format='simple',
+                 cache=None, **model_options):
+        super(CSVSerializer, self).__init__(
+            scheme, options, format, cache, **model_options)
+
+    def serialize(self, value):
+        """ Serialize to CSV. Scheme's `to_simple` hook is applied.
+
+        :return string: CSV
+
+        """
+        simple = super(CSVSerializer, self).serialize(value)
+
+        # Paginator
+        if hasattr(value, 'resources') and isinstance(simple, dict):
+            simple = simple.get('resources') or []
+
+        return ''.join(self.stream(simple, model=get_model(value)))
+
+    def stream(self, value, columns=None, header=True, model=None):
+        """ Serialize to CSV by chunks.
+
+        :param columns: Names of columns (taken from the first item by
+                        default)
+        :param header: Write names of columns
+        :param model: Model for columns' order (taken from the value by
+                      default)
+
+        :return generator: CSV chunks
+
+        """
+        items = self.iter_items(value)
+        if columns is None:
+            first = next(items, None)
+            if first is None:
+                return iter([])
+
+            columns = self.get_columns(first, model or get_model(value))
+            items = chain((first,), items)
+
+        getters = self.get_getters(columns)
+        rows = (self.get_row(item, getters) for item in items)
+        if header:
+            rows = chain(([smart_str(c) for c in columns],), rows)
+
+        return self.dumps_rows(rows)
+
+    def dumps_rows(self, rows):
+        """ Write rows to CSV by chunks.
+
+        :return generator: CSV chunks
+
+        """
+        output = StringIO()
+        writer = csv.writer(output)
+        for n, row in enumerate(rows):
+            writer.writerow(row)
+
+            if n % self.chunk_size == self.chunk_size - 1:
+                yield output.getvalue()
+                output.seek(0)
+                output.truncate()
+
+        chunk = output.getvalue()
+        if chunk:
+            yield chunk
+
+    def iter_items(self, value):
+        """ Iterate simplified items of a collection.
+
+        :return generator: items
+
+        """
+        value = getattr(value, 'resources', value)
+        if isinstance(value, QuerySet):
+            return self.iter_queryset(value, True, **self.model_options)
+
+        if isinstance(value, (Model, collections.Mapping)) or \
+                not isinstance(value, collections.Iterable):
+            value = [value]
+
+        return (self.to_simple(o, **self.model_options) for o in value)
+
+    def get_columns(self, item, model=None):
+        """ Get names of columns for a simplified item.
+
+        Columns of the model are taken from its plan, names which are not
+        in the plan (added by hooks) are taken from the item.
+
+        :return list: column's names
+
+        """
+        if not isinstance(item, dict):
+            return ['value']
+
+        names = sorted(item, key=lambda n: (n != 'id', n))
+        if model is None:
+            return list(flatten_names(item, names))
+
+        columns = [
+            c for c in self.get_model_columns(model, self.model_options)
+            if c.split(LOOKUP_SEP)[0] in item]
+        known = set(c.split(LOOKUP_SEP)[0] for c in columns)
+        return columns + list(flatten_names(
+            item, [n for n in names if n not in known]))
+
+    def get_model_columns(self, model, options, prefix=''):
+        """ Get names of columns by the model's plan.
+
+        :return list: column's names
+
+        """
+        plan, _ = self.get_plan(model, options)
+        columns = [prefix + 'id']
+        for fname, kind, _, related in plan.fields:
+            name = prefix + fname
+            if name in columns:
+                continue
+
+            rel_model = get_related_model(model, fname) \
+                if kind is ATTR and related else None
+            if rel_model is None:
+                columns.append(name)
+            else:
+                columns += self.get_model_columns(
+                    rel_model, related, name + LOOKUP_SEP)
+
+        return columns
+
+    @staticmethod
+    def get_getters(columns):
+        """ Compile getters of column's values (see :meth:`get_row`).
+
+        :return list: functions
+
+        """
+        return [
+            (lambda item, path=c.split(LOOKUP_SEP): get_path(item, path))
+            if LOOKUP_SEP in c else
+            (lambda item, name=c: item.get(name) if isinstance(
+                item, dict) else item)
+            for c in columns]
+
+    def get_row(self, item, getters):
+        """ Get CSV values of the item.
+
+        :return list: values
+
+        """
+        dumps = self.dumps_cell
+        return [dumps(getter(item)) for getter in getters]
+
+    @staticmethod
+    def dumps_cell(value):
+        if value is None:
+            return ''
+
+        if isinstance(value, unicode):
+            return value.encode('utf-8')
+
+        if isinstance(value, (list, dict)):
+            return backend.dumps(value)
+
+        return value
+
+
+def get_model(collection):
+    """ Get a model of the collection's items.
+
+    :return Model: model or None
+
+    """
+    collection = getattr(collection, 'resources', collection)
+    if isinstance(collection, QuerySet):
+        return collection.model
+
+    if isinstance(collection, (list, tuple)) and collection and \
+            isinstance(collection[0], Model):
+        return type(collection[0])
+
+    return None
+
+
+def get_related_model(model, name):
+    """ Get a model of the forward relation (foreign key, one to one).
+
+    :return Model: model or None
+
+    """
+    try:
+        field = model._meta.get_field(name)
+    except FieldDoesNotExist:
+        return None
+
+    if field.rel is None or isinstance(field.rel, ManyToManyRel):
+        return None
+
+    return field.rel.to
+
+
+def flatten_names(item, names, prefix=''):
+    """ Expand names of nested mappings with `__`.
+
+    :return generator: names
+
+    """
+    for name in names:
+        value = item.get(name)
+        if isinstance(value, dict):
+            for n in flatten_names(
+                    value, sorted(value), prefix + name + LOOKUP_SEP):
+                yield n
+        else:
+            yield prefix + name
+
+
+def get_path(item, path):
+    """ Get a value of nested mappings by path.
+
+    :return object: value or None
+
+    """
+    for name in path:
+        if not isinstance(item, dict):
+            return None
+        item = item.get(name)
+
+    return item
 
 
 class XMLSerializer(BaseSerializer):
 
     def serialize(self, value):
         simple = super(XMLSerializer, self).serialize(value)
-        return ''.join(s for s in self._dumps(simple))
+        return ''.join(self._dumps(simple))
 
-    def _dumps(self, value):  # nolint
-        tag = it = None
+    def stream(self, value):
+        """ Serialize to XML by chunks.
 
-        if isinstance(value, list):
-            tag = 'items'
-            it = iter(value)
+        QuerySets are read with `iterator()` and every item is serialized as
+        it comes. Scheme's `to_simple` hook is not applied.
 
-        elif isinstance(value, dict) and 'model' in value:
-            tag = value.get('model').split('.')[1]
-            it = value.iteritems()
+        :return generator: XML chunks
 
-        elif isinstance(value, dict):
-            it = value.iteritems()
+        """
+        return self._stream(value, self.model_options)
 
-        elif isinstance(value, tuple):
-            tag = str(value[0])
-            it = (i for i in value[1:])
+    def _stream(self, value, options):
+        try:
+            handler = self.dispatch[type(value)]
+        except KeyError:
+            handler = self.dispatch[type(value)] = self.resolve(type(value))
+
+        if handler is simple_protocol:
+            for chunk in self._stream(value.to_simple(self), options):
+                yield chunk
+
+        elif handler is simple_mapping and 'model' not in value:
+            for k, v in value.items():
+                yield "<%s>" % smart_str(k)
+                for chunk in self._stream(v, options):
+                    yield chunk
+                yield "</%s>" % smart_str(k)
+
+        elif handler is simple_iterable or handler is simple_queryset:
+            if handler is simple_queryset:
+                items = (
+                    self._dumps(o)
+                    for o in self.iter_queryset(value, True, **options))
+            else:
+                items = (self._stream(o, options) for o in value)
+
+            chunk = ['<items>']
+            for n, item in enumerate(items):
+                chunk.extend(item)
+
+                if n % self.chunk_size == self.chunk_size - 1:
+                    yield ''.join(chunk)
+                    chunk = []
+
+            chunk.append('</items>')
+            yield ''.join(chunk)
 
         else:
-            yield str(value)
+            for chunk in self._dumps(handler(self, value, **options)):
+                yield chunk
 
-        if tag:
-            yield "<%s>" % tag
+    def _dumps(self, value):
+        """ Dump a simplified value. Every element is yielded once.
 
-        if it:
-            try:
-                while True:
-                    v = next(it)
-                    yield ''.join(self._dumps(v))
-            except StopIteration:
-                yield ''
+        :return generator: XML pieces
 
-        if tag:
-            yield "</%s>" % tag
+        """
+        if isinstance(value, list):
+            yield '<items>'
+            for v in value:
+                for chunk in self._dumps(v):
+                    yield chunk
+            yield '</items>'
+
+        elif isinstance(value, dict):
+            tag = 'model' in value and smart_str(value['model'].split('.')[1])
+            if tag:
+                yield "<%s>" % tag
+
+            for k, v in value.iteritems():
+                yield "<%s>" % smart_str(k)
+                for chunk in self._dumps(v):
+                    yield chunk
+                yield "</%s>" % smart_str(k)
+
+            if tag:
+                yield "</%s>" % tag
+
+        elif isinstance(value, tuple):
+            yield "<%s>" % smart_str(value[0])
+            for v in value[1:]:
+                for chunk in self._dumps(v):
+                    yield chunk
+            yield "</%s>" % smart_str(value[0])
+
+        else:
+            yield escape(smart_str(value))
 
 
 # lint_ignore=W901,R0911,W0212,W0622
@@ -1,5 +1,10 @@
 import collections
 
+try:
+    from django.db.transaction import atomic
+except ImportError: # Django < 1.6
+    from django.db.transaction import commit_on_success as atomic
+
 
 def as_tuple(obj):
     " Given obj return a tuple "
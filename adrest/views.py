@@ -243,7 +243,9 @@ class ResourceView(
         url_regex = url_regex.replace('//', '/')
         url_name = '%s%s' % (name_prefix, cls._meta.url_name)
 
-        return url(url_regex, cls.as_view(api=api), name=url_name)
+        view = cls.as_view(api=api)
+        view.resource = cls
+        return url(url_regex, view, name=url_name)
 
 
 # pylama:ignore=E1120,W0703
@@ -1,5 +1,6 @@
 """ Models for tests. """
 
+from django.core.exceptions import ValidationError
 from django.db import models
 
 
@@ -19,18 +20,35 @@ class Pirate(models.Model):
         return self.name
 
 
+class Captain(Pirate):
+
+    """ Pirates which are always captains. """
+
+    class Meta:
+        proxy = True
+
+    def save(self, *args, **kwargs):
+        self.captain = True
+        super(Captain, self).save(*args, **kwargs)
+
+
 class Island(models.Model):
 
     """ Magical islands. """
 
     title = models.CharField(max_length=50)
 
+    def clean(self):
+        if self.title == 'Atlantis':
+            raise ValidationError("Atlantis is lost.")
+
 
 class Treasure(models.Model):
 
     """ Incrediable treasures. """
 
     created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
     pirate = models.ForeignKey(Pirate, null=True, blank=True)
     island = models.ForeignKey(Island)
 
@@ -41,3 +59,6 @@ class Boat(models.Model):
 
     title = models.CharField(max_length=50)
     pirate = models.ForeignKey(Pirate)
+
+    class Meta:
+        unique_together = 'pirate', 'title'
@@ -4,6 +4,7 @@ from mixer.backend.django import mixer
 
 from ..api import api as API
 from adrest.mixin import DynamicMixin
+from adrest.utils.exceptions import HttpError
 
 
 class CoreDynamicTest(API.testCase):
@@ -34,6 +35,288 @@ class CoreDynamicTest(API.testCase):
         self.assertEqual(list(response), sorted(
             pirates, key=lambda p: (p.name, p.captain)))
 
+    def test_filters(self):
+        from tests.core.models import Pirate
+
+        pirates = mixer.cycle(3).blend('core.pirate', captain=False)
+        treasure = mixer.blend('core.treasure', pirate=pirates[0])
+
+        class SomeResource(DynamicMixin, View):
+
+            class Meta:
+                model = 'core.pirate'
+                filter_fields = dict(
+                    name=('exact', 'icontains'),
+                    captain=None,
+                    treasure__island__title=None,
+                )
+
+            def dispatch(self, request, **resources):
+                return self.get_collection(request, **resources)
+
+        self.assertTrue('name__icontains__not' in SomeResource._meta.filters)
+        self.assertFalse('name__startswith' in SomeResource._meta.filters)
+
+        rf = RequestFactory()
+        resource = SomeResource()
+
+        response = resource.dispatch(
+            rf.get('/?name__icontains=' + pirates[1].name.upper()))
+        self.assertEqual(list(response), [pirates[1]])
+
+        response = resource.dispatch(rf.get(
+            '/?name=%s&name=%s' % (pirates[0].name, pirates[1].name)))
+        self.assertEqual(set(response), set(pirates[:2]))
+
+        response = resource.dispatch(rf.get('/?name__not=' + pirates[0].name))
+        self.assertEqual(set(response), set(pirates[1:]))
+
+        response = resource.dispatch(
+            rf.get('/?treasure__island__title=' + treasure.island.title))
+        self.assertEqual(list(response), [pirates[0]])
+
+        response = resource.dispatch(rf.get('/?captain=false&adr-sort=name'))
+        self.assertEqual(list(response), list(Pirate.objects.order_by('name')))
+
+        for query in ('name__startswith=a', 'character=good',
+                      'captain=maybe', 'name__icontains=a&name__icontains=b'):
+            self.assertRaises(
+                HttpError, resource.dispatch, rf.get('/?' + query))
+
+        with self.assertRaises(AssertionError):
+
+            class InvalidResource(DynamicMixin, View):
+
+                class Meta:
+                    model = 'core.pirate'
+                    filter_fields = dict(name='megadeath')
+
+        # Any lookup is allowed when filters are not defined
+        class AnyResource(SomeResource):
+
+            class Meta:
+                filter_fields = None
+
+        resource = AnyResource()
+        response = resource.dispatch(rf.get(
+            '/?name__icontains=%s&name__megadeath=1&treasure__pirate__name='
+            '%s' % (pirates[0].name.upper(), pirates[0].name)))
+        self.assertEqual(list(response), [pirates[0]])
+
+        response = resource.dispatch(
+            rf.get('/?name__iexact__not=' + pirates[0].name.upper()))
+        self.assertEqual(set(response), set(pirates[1:]))
+
+    def test_index_policy(self):
+        from StringIO import StringIO
+        from django.core.management import call_command
+
+        pirate = mixer.blend('core.pirate')
+
+        class SomeResource(DynamicMixin, View):
+
+            class Meta:
+                model = 'core.pirate'
+                index_policy = 'reject'
+
+            def dispatch(self, request, **resources):
+                return self.get_collection(request, **resources)
+
+        rf = RequestFactory()
+        resource = SomeResource()
+
+        response = resource.dispatch(
+            rf.get('/?id=%s&adr-sort=-id' % pirate.pk))
+        self.assertEqual(list(response), [pirate])
+
+        for query in ('name=' + pirate.name, 'adr-sort=name', 'adr-sort=?'):
+            self.assertRaises(
+                HttpError, resource.dispatch, rf.get('/?' + query))
+
+        resource._meta.index_policy = 'warn'
+        response = resource.dispatch(rf.get('/?adr-sort=name'))
+        self.assertEqual(list(response), [pirate])
+
+        # Checks are cached only when indexes are introspected
+        from adrest.utils.indexes import INDEXES, INDEXED
+        from tests.core.models import Pirate
+
+        self.assertEqual(
+            (Pirate, 'name', 'exact') in INDEXED, Pirate in INDEXES)
+
+        with self.assertRaises(AssertionError):
+
+            class InvalidResource(DynamicMixin, View):
+
+                class Meta:
+                    index_policy = 'ignore'
+
+        stdout = StringIO()
+        call_command('adrest_indexes', stdout=stdout)
+        self.assertTrue('book (main.book, index_policy=allow)\n'
+                        '  filter: price (' in stdout.getvalue())
+
+    def test_aggregate(self):
+        import json
+        from adrest.views import ResourceView
+
+        for name, character, captain in (
+                ('a', 'good', True), ('b', 'good', False),
+                ('c', 'evil', False)):
+            mixer.blend(
+                'core.pirate', name=name, character=character,
+                captain=captain)
+
+        class PirateResource(ResourceView):
+
+            class Meta:
+                model = 'core.pirate'
+                filter_fields = 'name', 'character'
+
+        def get(query):
+            response = PirateResource.as_view()(
+                RequestFactory().get('/?' + query))
+            return response.status_code, json.loads(response.content)
+
+        status, content = get('adr-aggregate=count,min:name,max:name')
+        self.assertEqual(
+            content, {'count': 3, 'name__min': 'a', 'name__max': 'c'})
+
+        status, content = get('adr-group=character&character__not=bad')
+        self.assertEqual(content, dict(
+            columns=['character', 'count'],
+            rows=[['evil', 1], ['good', 2]]))
+
+        status, content = get(
+            'adr-aggregate=count:name,max:name&adr-group=character'
+            '&name__not=a')
+        self.assertEqual(content['columns'], [
+            'character', 'name__count', 'name__max'])
+        self.assertEqual(content['rows'], [['evil', 1, 'c'], ['good', 1, 'b']])
+
+        for query in ('adr-aggregate=sum', 'adr-aggregate=sum:captain',
+                      'adr-aggregate=median:name', 'adr-group=captain'):
+            self.assertEqual(get(query)[0], 400)
+
+    def test_threads(self):
+        from threading import Thread
+
+        class SomeResource(DynamicMixin, View):
+
+            class Meta:
+                model = 'core.pirate'
+
+        queryset = SomeResource._meta['queryset']
+        rf = RequestFactory()
+        errors = []
+
+        def worker(n):
+            name = 'pirate%s' % n
+            try:
+                for _ in range(200):
+                    resource = SomeResource()
+                    collection = resource.get_collection(rf.get('/', dict(
+                        name=name)))
+                    assert resource.queryset is not queryset
+                    assert collection.query.sql_with_params()[1] == (name,)
+            except Exception, e: # noqa
+                errors.append(e)
+
+        threads = [Thread(target=worker, args=(n,)) for n in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertTrue(SomeResource._meta['queryset'] is queryset)
+        self.assertEqual(queryset._result_cache, None)
+
+        # Evaluated options do not cache results
+        mixer.blend('core.pirate')
+        self.assertEqual(len(SomeResource._meta.queryset), 1)
+        self.assertEqual(queryset._result_cache, None)
+        mixer.blend('core.pirate')
+        self.assertEqual(len(SomeResource._meta.queryset), 2)
+
+    def test_search(self):
+        from StringIO import StringIO
+        from django.core.management import call_command
+        from tests.core.models import Pirate
+
+        class SomeResource(DynamicMixin, View):
+
+            class Meta:
+                model = 'core.pirate'
+                search_fields = 'name', 'character'
+
+        class SameResource(SomeResource):
+            pass
+
+        self.assertEqual(
+            SameResource._meta.search_index, SomeResource._meta.search_index)
+        self.assertEqual(SomeResource._meta.search_index.rebuild(), 0)
+
+        silver = mixer.blend(
+            'core.pirate', name='Long John Silver', character='evil')
+        mixer.blend('core.pirate', name='Black Beard', character='evil')
+        mixer.blend('core.pirate', name='Jack Sparrow', character='good')
+
+        rf = RequestFactory()
+
+        def search(query):
+            return sorted(p.name for p in SomeResource().get_collection(
+                rf.get('/', {'adr-q': query})))
+
+        self.assertEqual(search('john'), ['Long John Silver'])
+        self.assertEqual(search('SILVER long'), ['Long John Silver'])
+        self.assertEqual(search('evil'), ['Black Beard', 'Long John Silver'])
+        self.assertEqual(search('bla*'), ['Black Beard'])
+        self.assertEqual(search('"john" OR jack'), [])
+        self.assertEqual(search('!!!'), [])
+
+        response = SomeResource().get_collection(
+            rf.get('/', {'adr-q': 'evil', 'name': 'Black Beard'}))
+        self.assertEqual([p.name for p in response], ['Black Beard'])
+
+        # Index is updated by signals
+        silver.name = 'Long Ben'
+        silver.save()
+        self.assertEqual(search('john'), [])
+        self.assertEqual(search('ben'), ['Long Ben'])
+
+        silver.delete()
+        self.assertEqual(search('long'), [])
+
+        # Bulk operations require rebuild
+        Pirate.objects.bulk_create([Pirate(name='Captain Flint')])
+        self.assertEqual(search('flint'), [])
+        self.assertEqual(SomeResource._meta.search_index.rebuild(), 3)
+        self.assertEqual(search('flint'), ['Captain Flint'])
+
+        stdout = StringIO()
+        call_command('adrest_search', stdout=stdout)
+        self.assertTrue(
+            'core.pirate (name, character)>: 3 rows' in stdout.getvalue())
+
+        # Tables created in atomic blocks could be rolled back
+        from django.db import connection
+
+        index = SomeResource._meta.search_index
+        self.assertEqual(
+            connection.alias in index.created,
+            not hasattr(connection, 'in_atomic_block'))
+
+        index.created.add(connection.alias)
+        try:
+            with self.settings(DEBUG=True):
+                start = len(connection.queries)
+                self.assertEqual(search('flint'), ['Captain Flint'])
+                queries = [q['sql'] for q in connection.queries[start:]]
+        finally:
+            index.created.discard(connection.alias)
+        self.assertFalse([q for q in queries if 'sqlite_master' in q])
+
     def test_pagination(self):
 
         pirates = mixer.cycle(3).blend('core.pirate')
@@ -61,4 +344,227 @@ class CoreDynamicTest(API.testCase):
         response = resource.dispatch(rf.get('/?adr-max=1'))
         self.assertEqual(len(response.resources), 1)
 
+        resource._meta.limit_per_page = 2
+        with self.assertNumQueries(1):
+            response = SomeResource().dispatch(rf.get('/?adr-count=0'))
+            simple = response.to_simple()
+        self.assertEqual(simple['count'], None)
+        self.assertEqual(simple['num_pages'], None)
+        self.assertEqual(len(simple['resources']), 2)
+        self.assertTrue('page=2' in simple['next'])
+
+        resource._meta.paginate_count = False
+        response = resource.dispatch(rf.get('/?page=2'))
+        self.assertEqual(len(response.resources), 1)
+        self.assertFalse(response.next_page)
+        self.assertTrue(response.previous_page)
+
+        response = resource.dispatch(rf.get('/?page=3'))
+        self.assertRaises(HttpError, lambda: response.resources)
+
+    def test_count_cache(self):
+        from django.core.cache import cache
+        from adrest.utils.cache import DEFAULT_TIMEOUT
+
+        cache.clear()
+        pirates = mixer.cycle(3).blend('core.pirate', captain=False)
+
+        class SomeResource(DynamicMixin, View):
+
+            class Meta:
+                model = 'core.pirate'
+                limit_per_page = 2
+                paginate_count_cache = 60
+
+            def dispatch(self, request, **resources):
+                collection = self.get_collection(request, **resources)
+                return self.paginate(request, collection).to_simple()
+
+        rf = RequestFactory()
+
+        with self.assertNumQueries(2):
+            content = SomeResource().dispatch(rf.get('/'))
+        self.assertEqual(content['count'], 3)
+
+        with self.assertNumQueries(1):
+            content = SomeResource().dispatch(rf.get('/?adr-sort=-name'))
+        self.assertEqual(content['count'], 3)
+
+        with self.assertNumQueries(2):
+            content = SomeResource().dispatch(
+                rf.get('/?name=' + pirates[0].name))
+        self.assertEqual(content['count'], 1)
+
+        mixer.blend('core.pirate')
+        with self.assertNumQueries(2):
+            content = SomeResource().dispatch(rf.get('/'))
+        self.assertEqual(content['count'], 4)
+
+        class DefaultResource(SomeResource):
+
+            class Meta:
+                paginate_count_cache = True
+
+        # Default timeout of cache's backend
+        self.assertTrue(
+            DefaultResource._meta.count_cache.timeout is DEFAULT_TIMEOUT)
+
+    def test_cursor_pagination(self):
+        import json
+        from base64 import urlsafe_b64encode
+        from urlparse import urlparse
+        from adrest.utils.paginator import CursorPaginator
+        from tests.core.models import Pirate
+
+        for name in 'abbcdee':
+            mixer.blend('core.pirate', name=name)
+
+        class SomeResource(DynamicMixin, View):
+
+            class Meta:
+                model = 'core.pirate'
+                limit_per_page = 3
+                paginator = CursorPaginator
+
+            def dispatch(self, request, **resources):
+                collection = self.get_collection(request, **resources)
+                return self.paginate(request, collection)
+
+        rf = RequestFactory()
+        resource = SomeResource()
+
+        for sort in ('name', '-name'):
+            expected = list(Pirate.objects.order_by(sort, 'pk'))
+            pages, url = [], '/?adr-sort=' + sort
+            while url:
+                with self.assertNumQueries(1):
+                    response = resource.dispatch(
+                        rf.get('/?' + urlparse(url).query))
+                    pages.append(response.resources)
+                    url = response.next_page
+                self.assertEqual(
+                    bool(response.previous_page), len(pages) > 1)
+
+            self.assertEqual(len(pages), 3)
+            self.assertEqual(sum(pages, []), expected)
+            self.assertFalse('count' in response.to_simple())
+
+            url = response.previous_page
+            response = resource.dispatch(rf.get('/?' + urlparse(url).query))
+            self.assertEqual(response.resources, pages[1])
+            response = resource.dispatch(
+                rf.get('/?' + urlparse(response.previous_page).query))
+            self.assertEqual(response.resources, pages[0])
+            self.assertFalse(response.previous_page)
+
+        response = resource.dispatch(rf.get('/?cursor=invalid'))
+        self.assertRaises(HttpError, lambda: response.resources)
+
+        # Values of cursor are checked by fields
+        cursor = urlsafe_b64encode(json.dumps(['next', ['pk'], ['abc']]))
+        response = resource.dispatch(rf.get('/?cursor=' + cursor))
+        try:
+            response.resources
+        except HttpError, e:
+            self.assertEqual(e.status, 400)
+        else:
+            self.fail("Invalid cursor is accepted")
+
+        resource._meta.limit_per_page = 0
+        response = resource.dispatch(rf.get('/'))
+        self.assertEqual(len(response), 7)
+
+    def test_relations(self):
+        from adrest.views import ResourceView
+
+        pirates = mixer.cycle(2).blend('core.pirate')
+        for pirate in pirates:
+            mixer.cycle(2).blend('core.boat', pirate=pirate)
+
+        class BoatResource(ResourceView):
+
+            class Meta:
+                model = 'core.boat'
+                emit_related = dict(pirate=dict(fields='name'))
+
+        self.assertEqual(BoatResource._meta.emit_relations, (['pirate'], []))
+
+        class PirateResource(ResourceView):
+
+            class Meta:
+                model = 'core.pirate'
+                emit_include = 'boat_set', 'treasure_set'
+                emit_related = dict(boat_set=dict(
+                    related=dict(pirate=dict(fields='name'))))
+
+            @staticmethod
+            def to_simple__treasure_set(pirate, serializer=None):
+                return []
+
+        self.assertEqual(PirateResource._meta.emit_relations, (
+            [], ['boat_set', 'boat_set__pirate']))
+
+        rf = RequestFactory()
+        resource = PirateResource()
+        request = rf.get('/')
+        collection = resource.get_collection(request)
+        with self.assertNumQueries(2):
+            response = resource.emit(collection, request=request)
+        self.assertContains(response, pirates[0].name)
+
+        resource._meta.emit_stream = True
+        with self.assertNumQueries(2):
+            response = resource.emit(
+                resource.get_collection(request), request=request)
+            self.assertTrue(pirates[0].name in ''.join(
+                response.streaming_content))
+        resource._meta.emit_stream = False
+
+
+    def test_fields(self):
+        from django.db import connection
+
+        pirate = mixer.blend('core.pirate')
+        boat = mixer.blend('core.boat', pirate=pirate)
+
+        with self.settings(DEBUG=True):
+            start = len(connection.queries)
+            response = self.get_resource(
+                'pirate', data={'adr-fields': 'name,character'})
+            queries = [q['sql'] for q in connection.queries[start:]
+                       if 'SELECT' in q['sql']]
+        self.assertEqual(sorted(response.json['resources'][0]['fields']), [
+            'character', 'name'])
+        self.assertFalse([q for q in queries if 'captain' in q])
+        self.assertEqual(
+            response.json['resources'][0]['model'], 'core.pirate')
+
+        response = self.get_resource(
+            'pirate', pirate=pirate, data={'adr-fields': 'name'})
+        self.assertEqual(response.json['fields'], dict(name=pirate.name))
+
+        response = self.get_resource(
+            'pirate-boat', pirate=pirate, boat=boat,
+            data={'adr-fields': 'title'})
+        self.assertEqual(response.json['fields'], dict(title=boat.title))
+
+        response = self.get_resource(
+            'pirate', data={'adr-fields': 'name,password'})
+        self.assertEqual(response.status_code, 400)
+        self.assertContains(
+            response, 'Unknown fields: password', status_code=400)
+
+        # Primary key is always allowed
+        response = self.get_resource(
+            'pirate', pirate=pirate, data={'adr-fields': 'id'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json['pk'], pirate.pk)
+        self.assertEqual(response.json['fields'], dict(id=pirate.pk))
+
+        response = self.get_resource(
+            'pirate', data={'adr-fields': 'id,name'})
+        self.assertEqual(
+            sorted(response.json['resources'][0]['fields']), ['id', 'name'])
+
+
 # lint_ignore=C0110,E1103
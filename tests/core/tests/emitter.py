@@ -4,7 +4,10 @@ from django.views.generic import View
 
 from ..api import api as API
 from adrest.mixin import EmitterMixin
+from adrest.utils.emitter import JSONEmitter, XMLEmitter
+from adrest.utils.parser import JSONParser
 from adrest.tests import AdrestTestCase
+from adrest.views import ResourceView
 from mixer.backend.django import mixer
 
 
@@ -125,4 +128,334 @@ class CoreEmitterTest(AdrestTestCase):
         self.assertFalse('fields' in response.content)
 
 
+    def test_stream(self):
+        import json
+        from django.test import RequestFactory
+        from adrest.utils.paginator import Paginator
+        from adrest.utils.response import SerializedHttpResponse
+        from tests.core.models import Pirate
+
+        mixer.cycle(3).blend('core.pirate')
+
+        class Resource(View, EmitterMixin):
+
+            class Meta:
+                model = 'core.pirate'
+                dyn_prefix = 'adr-'
+                emit_stream = True
+                limit_per_page = 2
+
+        resource = Resource()
+        response = resource.emit(Pirate.objects.all())
+        self.assertTrue(response.streaming)
+        streamed = json.loads(''.join(response.streaming_content))
+
+        resource._meta.emit_stream = False
+        response = resource.emit(Pirate.objects.all())
+        self.assertFalse(response.streaming)
+        self.assertEqual(streamed, json.loads(response.content))
+        self.assertEqual(len(streamed), 3)
+
+        resource._meta.emit_stream = True
+        request = RequestFactory().get('/')
+        response = resource.emit(
+            Paginator(request, resource, Pirate.objects.all()),
+            request=request)
+        self.assertTrue(response.streaming)
+        self.assertTrue('rel="next"' in response['Link'])
+        content = json.loads(''.join(response.streaming_content))
+        self.assertEqual(content['count'], 3)
+        self.assertEqual(len(content['resources']), 2)
+        self.assertTrue(content['next'])
+
+        # Collections are kept for streaming emitters only
+        from django.db.models.query import QuerySet
+        from adrest.utils import UpdatedList
+        from adrest.utils.emitter import XMLTemplateEmitter
+
+        class ListResource(ResourceView):
+
+            class Meta:
+                model = 'core.pirate'
+                emit_stream = True
+                emitters = JSONEmitter, XMLTemplateEmitter
+                limit_per_page = 0
+
+        self.assertTrue(isinstance(ListResource().paginate(
+            request, Pirate.objects.all()), QuerySet))
+        self.assertTrue(isinstance(ListResource().paginate(
+            RequestFactory().get('/', HTTP_ACCEPT='application/xml'),
+            Pirate.objects.all()), UpdatedList))
+
+        # Headers and cookies of handler's response are kept
+        content = SerializedHttpResponse(Pirate.objects.all())
+        content['X-Pirates'] = 'many'
+        content.set_cookie('ship', 'boat')
+        response = resource.emit(content, request=request)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['X-Pirates'], 'many')
+        self.assertEqual(response.cookies['ship'].value, 'boat')
+        self.assertEqual(response['Content-Type'], 'application/json')
+
+        class StreamResource(ResourceView):
+
+            class Meta:
+                model = 'core.pirate'
+                emit_stream = True
+                emitters = JSONEmitter, XMLEmitter
+                limit_per_page = 0
+
+        response = StreamResource.as_view()(request)
+        self.assertTrue(response.streaming)
+        self.assertEqual(len(json.loads(''.join(
+            response.streaming_content))), 3)
+
+        response = StreamResource.as_view()(
+            RequestFactory().get('/', HTTP_ACCEPT='application/xml'))
+        self.assertTrue(response.streaming)
+        content = ''.join(response.streaming_content)
+        self.assertTrue(content.startswith('<?xml'))
+        self.assertTrue(content.endswith('</items></response>'))
+        self.assertEqual(content.count('<pirate>'), 3)
+
+        with self.assertRaises(AssertionError):
+
+            class HookedResource(View, EmitterMixin):
+
+                class Meta:
+                    emit_stream = True
+
+                @staticmethod
+                def to_simple(content, simple, serializer=None):
+                    return simple
+
+    def test_cache(self):
+        import json
+        from django.core.cache import cache
+        from adrest.utils.cache import DEFAULT_TIMEOUT
+        from tests.core.models import Pirate
+
+        cache.clear()
+        pirates = mixer.cycle(3).blend('core.pirate')
+
+        class Resource(View, EmitterMixin):
+
+            class Meta:
+                model = 'core.pirate'
+                emit_cache = 60
+
+        resource = Resource()
+        content = json.loads(resource.emit(Pirate.objects.all()).content)
+        self.assertEqual(len(content), 3)
+
+        with self.assertNumQueries(1):
+            response = resource.emit(Pirate.objects.all())
+        self.assertEqual(json.loads(response.content), content)
+
+        with self.assertNumQueries(0):
+            response = resource.emit(pirates[1])
+        self.assertEqual(json.loads(response.content), content[1])
+
+        # Changes without signals are not visible
+        Pirate.objects.filter(pk=pirates[0].pk).update(name='Stale')
+        response = resource.emit(Pirate.objects.all())
+        self.assertEqual(json.loads(response.content), content)
+
+        pirates[0].name = 'Jack'
+        pirates[0].save()
+        pirates[2].delete()
+        content = json.loads(resource.emit(Pirate.objects.all()).content)
+        self.assertEqual(len(content), 2)
+        self.assertEqual(content[0]['fields']['name'], 'Jack')
+
+        class DefaultResource(Resource):
+
+            class Meta:
+                emit_cache = True
+
+        # Default timeout of cache's backend
+        self.assertTrue(DefaultResource._meta.emit_model_cache.timeout is
+                        DEFAULT_TIMEOUT)
+
+    def test_msgpack(self):
+        import json
+        import msgpack
+        from django.test import RequestFactory
+        from adrest.utils.emitter import MsgPackEmitter
+        from adrest.utils.exceptions import HttpError
+        from adrest.utils.parser import MsgPackParser
+        from tests.core.models import Pirate
+
+        mixer.cycle(3).blend('core.pirate')
+
+        class Resource(ResourceView):
+
+            class Meta:
+                model = 'core.pirate'
+                emitters = JSONEmitter, MsgPackEmitter
+                parsers = JSONParser, MsgPackParser
+
+        resource = Resource()
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT='application/x-msgpack')
+        self.assertEqual(resource.determine_emitter(request), MsgPackEmitter)
+
+        response = resource.emit(Pirate.objects.all(), request=request)
+        self.assertEqual(response['Content-type'], 'application/x-msgpack')
+        content = msgpack.unpackb(response.content, raw=False)
+        self.assertEqual(content, json.loads(
+            resource.emit(Pirate.objects.all()).content))
+        self.assertTrue(all(
+            isinstance(key, unicode) for key in content[0].keys() +
+            content[0]['fields'].keys()))
+        self.assertTrue(isinstance(content[0]['model'], unicode))
+
+        request = RequestFactory().post(
+            '/', msgpack.packb(dict(name=u'Jack')),
+            content_type='application/x-msgpack')
+        self.assertEqual(resource.parse(request), dict(name=u'Jack'))
+
+        request = RequestFactory().post(
+            '/', '\xc1', content_type='application/x-msgpack')
+        self.assertRaises(HttpError, resource.parse, request)
+
+    def test_columns(self):
+        import json
+        from django.test import RequestFactory
+        from adrest.utils import UpdatedList
+        from adrest.utils.emitter import ColumnsJSONEmitter
+        from adrest.utils.paginator import Paginator
+        from tests.core.models import Pirate
+
+        pirates = mixer.cycle(3).blend('core.pirate')
+
+        class Resource(ResourceView):
+
+            class Meta:
+                model = 'core.pirate'
+                emit_format = 'simple'
+                emit_fields = 'name', 'captain'
+                emitters = JSONEmitter, ColumnsJSONEmitter
+                limit_per_page = 2
+
+        resource = Resource()
+        request = RequestFactory().get(
+            '/', HTTP_ACCEPT=ColumnsJSONEmitter.media_type)
+        self.assertEqual(
+            resource.determine_emitter(request), ColumnsJSONEmitter)
+
+        response = resource.emit(Pirate.objects.all(), request=request)
+        content = json.loads(response.content)
+        self.assertEqual(content['columns'], ['captain', 'id', 'name'])
+        self.assertEqual(content['rows'], [
+            [p.captain, p.pk, p.name] for p in pirates])
+
+        response = resource.emit(
+            UpdatedList(pirates[:1]), emitter=ColumnsJSONEmitter)
+        self.assertEqual(json.loads(response.content)['rows'], [
+            [pirates[0].captain, pirates[0].pk, pirates[0].name]])
+
+        response = resource.emit(
+            Paginator(request, resource, Pirate.objects.all()),
+            emitter=ColumnsJSONEmitter)
+        content = json.loads(response.content)
+        self.assertEqual(content['count'], 3)
+        self.assertEqual(len(content['resources']['rows']), 2)
+
+        # Heterogeneous content
+        response = resource.emit(
+            [pirates[0], dict(name='Bill')], emitter=ColumnsJSONEmitter)
+        self.assertEqual(json.loads(response.content)[1], dict(name='Bill'))
+
+    def test_csv(self):
+        from django.test import RequestFactory
+        from adrest.utils import UpdatedList
+        from adrest.utils.emitter import CSVEmitter
+        from adrest.utils.paginator import Paginator
+        from tests.core.models import Treasure
+
+        pirate = mixer.blend('core.pirate', name='Jack, "Black"')
+        treasures = mixer.cycle(3).blend('core.treasure', pirate=pirate)
+
+        class Resource(ResourceView):
+
+            class Meta:
+                model = 'core.treasure'
+                emit_fields = 'pirate', 'island', 'created_at'
+                emit_related = dict(pirate=dict(fields=('name', 'captain')))
+                emitters = JSONEmitter, CSVEmitter
+                limit_per_page = 2
+
+        resource = Resource()
+        request = RequestFactory().get('/', HTTP_ACCEPT='text/csv')
+        self.assertEqual(resource.determine_emitter(request), CSVEmitter)
+
+        response = resource.emit(Treasure.objects.all(), request=request)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = ''.join(response.streaming_content).splitlines()
+        self.assertEqual(
+            rows[0], 'id,created_at,pirate__id,pirate__name,'
+            'pirate__captain,island')
+        self.assertEqual(len(rows), 4)
+        self.assertTrue(rows[1].startswith('%s,' % treasures[0].pk))
+        self.assertTrue(rows[1].endswith(
+            ',%s,"Jack, ""Black""",False,%s' % (
+                pirate.pk, treasures[0].island_id)))
+
+        # Columns do not depend on the first row
+        lost = mixer.blend('core.treasure', pirate=None)
+        response = resource.emit(
+            UpdatedList([lost, treasures[0]]), request=request)
+        rows = ''.join(response.streaming_content).splitlines()
+        self.assertEqual(
+            rows[0], 'id,created_at,pirate__id,pirate__name,'
+            'pirate__captain,island')
+        self.assertTrue(rows[1].endswith(',,,,%s' % lost.island_id))
+        self.assertTrue(rows[2].endswith(
+            ',%s,"Jack, ""Black""",False,%s' % (
+                pirate.pk, treasures[0].island_id)))
+        lost.delete()
+
+        response = resource.emit(
+            UpdatedList(treasures[:1]), request=request)
+        self.assertEqual(
+            len(''.join(response.streaming_content).splitlines()), 2)
+
+        response = resource.emit(
+            Paginator(request, resource, Treasure.objects.all()),
+            request=request)
+        self.assertEqual(
+            len(''.join(response.streaming_content).splitlines()), 3)
+
+        # Client's sparse fieldset
+        request = RequestFactory().get(
+            '/', {'adr-fields': 'island'}, HTTP_ACCEPT='text/csv')
+        response = resource.emit(Treasure.objects.all(), request=request)
+        self.assertEqual(
+            ''.join(response.streaming_content).splitlines()[0],
+            'id,island')
+
+        # Resource's `to_simple` is applied, content is not streamed
+        class HiddenResource(Resource):
+
+            class Meta:
+                emit_fields = 'pirate', 'island'
+
+            @staticmethod
+            def to_simple(content, simple, serializer=None):
+                for item in simple['resources']:
+                    item.pop('pirate')
+                return simple
+
+        resource = HiddenResource()
+        request = RequestFactory().get('/', HTTP_ACCEPT='text/csv')
+        response = resource.emit(
+            Paginator(request, resource, Treasure.objects.all()),
+            request=request)
+        self.assertFalse(response.streaming)
+        self.assertEqual(response.content.splitlines()[0], 'id,island')
+        self.assertEqual(len(response.content.splitlines()), 3)
+
+
 # lint_ignore=W0212,E0102,C0110
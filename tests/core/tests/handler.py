@@ -1,3 +1,4 @@
+from django import forms
 from django.db import models
 from django.views.generic import View
 from django.test import RequestFactory
@@ -130,5 +131,317 @@ class CoreHandlerTest(API.testCase):
         for p in response.json:
             self.assertEqual(p['fields']['character'], 'sorrow')
 
+    def test_post_list(self):
+        import json
+        from adrest.views import ResourceView
+        from tests.core.models import Pirate
+
+        class PirateResource(ResourceView):
+
+            class Meta:
+                allowed_methods = 'GET', 'POST'
+                model = 'core.pirate'
+                bulk_create = 2
+                search_fields = 'name',
+
+        self.assertEqual(PirateResource._meta.search_index.rebuild(), 0)
+
+        response = self.post_resource('pirate', json=True, data=[
+            dict(name='John', character='evil'),
+            dict(name='Bill', character='good')])
+        self.assertEqual(
+            [p['fields']['name'] for p in response.json], ['John', 'Bill'])
+        self.assertEqual(Pirate.objects.count(), 2)
+
+        response = self.post_resource('pirate', json=True, data=[
+            dict(name='Tom', character='good'),
+            dict(name='Jack', character='unknown'), 'Mike'])
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([e['index'] for e in response.json], [1, 2])
+        self.assertTrue('character' in response.json[0]['errors'])
+        self.assertEqual(Pirate.objects.count(), 2)
+
+        response = self.client.post(
+            self.reverse('pirate'), content_type='application/x-ndjson',
+            data='{"name": "Tom", "character": "good"}\n\n'
+            '{"name": "Jack", "character": "evil"}\n')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(Pirate.objects.count(), 4)
+
+        response = self.client.post(
+            self.reverse('pirate'), content_type='application/x-ndjson',
+            data='{"name": "Tom"}\n{"name"')
+        self.assertContains(response, 'line 2', status_code=400)
+
+        def post(resource, data):
+            return resource.as_view()(RequestFactory().post(
+                '/', content_type='application/json', data=json.dumps(data)))
+
+        def count(resource):
+            response = resource.as_view()(RequestFactory().get('/'))
+            return json.loads(response.content)['count']
+
+        class IslandResource(ResourceView):
+
+            class Meta:
+                allowed_methods = 'GET', 'POST'
+                model = 'core.island'
+                bulk_create = 2
+                limit_per_page = 2
+                paginate_count_cache = True
+
+        self.assertEqual(count(IslandResource), 0)
+        response = post(IslandResource, [
+            dict(title='Island%s' % n) for n in range(5)])
+        self.assertEqual(json.loads(response.content), dict(count=5))
+        self.assertEqual(count(IslandResource), 5)
+
+        # Models with full-text indexes are saved one by one
+        response = post(PirateResource, [
+            dict(name='Pirate%s' % n, character='evil') for n in range(5)])
+        self.assertEqual(len(json.loads(response.content)), 5)
+        response = PirateResource.as_view()(
+            RequestFactory().get('/', {'adr-q': 'pirate3'}))
+        self.assertEqual([p['fields']['name'] for p in json.loads(
+            response.content)['resources']], ['Pirate3'])
+
+        # Plain forms
+        class NameForm(forms.Form):
+
+            name = forms.CharField()
+
+            def save(self):
+                return Pirate.objects.create(
+                    name=self.cleaned_data['name'], character='good')
+
+        class FormResource(PirateResource):
+
+            class Meta:
+                form = NameForm
+
+        response = post(FormResource, [dict(name='Tom'), dict(name='Bob')])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [p['fields']['name'] for p in json.loads(response.content)],
+            ['Tom', 'Bob'])
+
+    def test_bulk_update(self):
+        import json
+        from django.core.cache import cache
+        from django.db import connection
+        from adrest.forms import PartitialForm
+        from adrest.views import ResourceView
+        from tests.core.models import Pirate
+
+        cache.clear()
+        pirates = mixer.cycle(3).blend('core.pirate', character='evil')
+
+        class PirateResource(ResourceView):
+
+            class Meta:
+                allowed_methods = 'GET', 'PUT', 'PATCH'
+                model = 'core.pirate'
+                bulk_update = True
+                emit_cache = True
+
+        def request(resource, data=None, method='PUT'):
+            data = json.dumps(dict(data or {}, pirate=[p.pk for p in pirates]))
+            if method == 'GET':
+                return resource.as_view()(RequestFactory().get(
+                    '/', dict(pirate=[p.pk for p in pirates])))
+            return resource.as_view()(RequestFactory().generic(
+                method, '/', data, content_type='application/json'))
+
+        def characters(response):
+            return [p['fields']['character']
+                    for p in json.loads(response.content)]
+
+        self.assertEqual(characters(request(PirateResource, method='GET')),
+                         ['evil'] * 3)
+
+        with self.settings(DEBUG=True):
+            start = len(connection.queries)
+            response = request(PirateResource, dict(character='good'))
+            queries = [q['sql'] for q in connection.queries[start:]
+                       if 'UPDATE "core_pirate"' in q['sql']]
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(characters(response), ['good'] * 3)
+        self.assertEqual(
+            Pirate.objects.filter(character='good').count(), 3)
+
+        # Cached resources are invalidated
+        self.assertEqual(characters(request(PirateResource, method='GET')),
+                         ['good'] * 3)
+
+        response = request(PirateResource, dict(character='unknown'), 'PATCH')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(
+            Pirate.objects.filter(character='good').count(), 3)
+
+        # Updated field is filtered by the resource's queryset
+        class GoodResource(PirateResource):
+
+            class Meta:
+                queryset = Pirate.objects.filter(character='good')
+
+        response = request(GoodResource, dict(character='sorrow'))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(characters(response), ['sorrow'] * 3)
+
+        class PirateForm(PartitialForm):
+
+            class Meta:
+                model = Pirate
+
+            def clean_name(self):
+                return self.cleaned_data['name'].upper()
+
+        class FormResource(PirateResource):
+
+            class Meta:
+                form = PirateForm
+
+        response = request(FormResource, dict(name='john'))
+        self.assertEqual(
+            [p['fields']['name'] for p in json.loads(response.content)],
+            ['JOHN'] * 3)
+
+        # Relations of the resource's queryset are kept
+        treasures = mixer.cycle(3).blend('core.treasure', pirate=mixer.select)
+        island = mixer.blend('core.island')
+
+        class TreasureResource(ResourceView):
+
+            class Meta:
+                allowed_methods = 'GET', 'PUT'
+                model = 'core.treasure'
+                bulk_update = True
+                emit_related = dict(pirate=dict(fields='name'))
+
+        with self.settings(DEBUG=True):
+            start = len(connection.queries)
+            response = TreasureResource.as_view()(RequestFactory().generic(
+                'PUT', '/', json.dumps(dict(
+                    island=island.pk, treasure=[t.pk for t in treasures])),
+                content_type='application/json'))
+            queries = [q['sql'] for q in connection.queries[start:]]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            [t['fields']['island'] for t in json.loads(response.content)],
+            [island.pk] * 3)
+
+        # Updated instances are read with one query
+        queries = queries[[n for n, q in enumerate(queries)
+                           if 'UPDATE "core_treasure"' in q][0]:]
+        self.assertEqual(
+            len([q for q in queries if 'SELECT' in q]), 1)
+        self.assertFalse([q for q in queries if 'FROM "core_pirate"' in q])
+
+        # Uniqueness and model's validation require instances
+        from django.forms.models import modelform_factory
+        from adrest.mixin.handler import get_update_fields
+        from tests.core.models import Boat, Island
+
+        form = modelform_factory(Boat, form=PartitialForm)
+        self.assertEqual(get_update_fields(form, dict(title='Pearl')), None)
+        form = modelform_factory(Island, form=PartitialForm)
+        self.assertEqual(get_update_fields(form, dict(title='Tortuga')), None)
+        form = modelform_factory(Pirate, form=PartitialForm)
+        self.assertEqual(get_update_fields(form, dict(name='Jack')), ['name'])
+
+    def test_bulk_delete(self):
+        from django.db import connection
+        from adrest.views import ResourceView
+
+        pirates = mixer.cycle(5).blend('core.pirate')
+        mixer.blend('core.pirate')
+
+        class PirateResource(ResourceView):
+
+            class Meta:
+                allowed_methods = 'GET', 'DELETE'
+                model = 'core.pirate'
+                bulk_delete = 2
+
+        request = RequestFactory().delete(
+            '/?' + '&'.join('pirate=%s' % p.pk for p in pirates))
+        with self.settings(DEBUG=True):
+            start = len(connection.queries)
+            response = PirateResource.as_view()(request)
+            queries = [q['sql'] for q in connection.queries[start:]
+                       if 'DELETE FROM "core_pirate"' in q['sql']]
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(queries), 3)
+        self.assertEqual(PirateResource._meta.model.objects.count(), 1)
+
+    def test_patch(self):
+        import json
+        from datetime import datetime
+        from adrest.views import ResourceView
+        from tests.core.models import Pirate, Treasure
+
+        pirate = mixer.blend('core.pirate', name='John', character='evil')
+
+        class PirateResource(ResourceView):
+
+            class Meta:
+                allowed_methods = 'GET', 'PUT', 'PATCH'
+                model = 'core.pirate'
+
+        def patch(data, resource=PirateResource, pk=None):
+            data = dict(data, **{resource._meta.name: pk or pirate.pk})
+            request = RequestFactory().generic(
+                'PATCH', '/', json.dumps(data),
+                content_type='application/json')
+            return resource.as_view()(request)
+
+        # Changes of other columns are not overwritten, other columns are
+        # not validated
+        Pirate.objects.filter(pk=pirate.pk).update(character='unknown')
+        response = patch(dict(name='Bill'))
+        self.assertEqual(response.status_code, 200)
+        pirate = Pirate.objects.get(pk=pirate.pk)
+        self.assertEqual(pirate.name, 'Bill')
+        self.assertEqual(pirate.character, 'unknown')
+
+        response = patch(dict(name='Tom', character='unknown'))
+        self.assertContains(response, 'character', status_code=400)
+
+        response = patch(dict(character='good', captain=True))
+        pirate = Pirate.objects.get(pk=pirate.pk)
+        self.assertEqual(
+            (pirate.name, pirate.character, pirate.captain),
+            ('Bill', 'good', True))
+
+        # Columns which are changed by model's save
+        Pirate.objects.filter(pk=pirate.pk).update(captain=False)
+
+        class CaptainResource(PirateResource):
+
+            class Meta:
+                model = 'core.captain'
+
+        response = patch(dict(name='Jack'), CaptainResource)
+        self.assertEqual(response.status_code, 200)
+        pirate = Pirate.objects.get(pk=pirate.pk)
+        self.assertEqual((pirate.name, pirate.captain), ('Jack', True))
+
+        # Auto updated columns
+        treasure = mixer.blend('core.treasure')
+        Treasure.objects.filter(pk=treasure.pk).update(
+            updated_at=datetime(2000, 1, 1))
+
+        class TreasureResource(PirateResource):
+
+            class Meta:
+                model = 'core.treasure'
+
+        response = patch(
+            dict(pirate=pirate.pk), TreasureResource, treasure.pk)
+        self.assertEqual(response.status_code, 200)
+        treasure = Treasure.objects.get(pk=treasure.pk)
+        self.assertEqual(treasure.pirate, pirate)
+        self.assertTrue(treasure.updated_at.year > 2000)
+
 
 # lint_ignore=F0401,C,E1103
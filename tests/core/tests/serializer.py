@@ -87,6 +87,23 @@ class CoreSerializerTest(TestCase):
         self.assertTrue(out['fields']['boat_set'])
         self.assertEqual(len(list(out['fields']['boat_set'])), 2)
 
+        # Lazy objects
+        from django.utils.functional import SimpleLazyObject
+
+        serializer = BaseSerializer()
+        out = serializer.to_simple(SimpleLazyObject(lambda: pirate))
+        self.assertEqual(out, serializer.to_simple(pirate))
+        self.assertEqual(out['fields']['name'], 'Billy')
+
+        # Converters of instances
+        class Ship(object):
+            pass
+
+        ship = Ship()
+        ship.to_simple = lambda serializer: 'ship'
+        self.assertEqual(serializer.to_simple(ship), 'ship')
+        self.assertTrue(serializer.to_simple(Ship()).startswith('<'))
+
     def test_paginator(self):
         from adrest.mixin import EmitterMixin
         from django.views.generic import View
@@ -123,6 +140,13 @@ class CoreSerializerTest(TestCase):
         worker = XMLSerializer()
         test = worker.serialize(Book.objects.all())
         self.assertTrue("author" in test)
+        self.assertEqual(u''.join(worker.stream(Book.objects.all())), test)
+
+        test = worker.serialize(dict(title='Tom & <Jerry>'))
+        self.assertEqual(test, '<title>Tom &amp; &lt;Jerry&gt;</title>')
+
+        test = worker.serialize(dict(title=u'\u0416'))
+        self.assertEqual(test.decode('utf-8'), u'<title>\u0416</title>')
 
     def test_json(self):
         from ...main.models import Author
@@ -135,3 +159,112 @@ class CoreSerializerTest(TestCase):
         test = worker.serialize(authors)
         self.assertTrue("main.author" in test)
         self.assertTrue('":{"' in test)
+
+    def test_plans(self):
+        from adrest.utils.serializer import BaseSerializer, PLANS
+        from tests.core.models import Boat
+
+        boats = mixer.cycle(3).blend('core.boat')
+
+        class Scheme(object):
+
+            @staticmethod
+            def to_simple__title(boat, serializer=None):
+                return boat.title.upper()
+
+            @staticmethod
+            def to_simple(content, simple, serializer=None):
+                return simple
+
+        serializer = BaseSerializer(
+            scheme=Scheme(), related=dict(pirate=dict(fields='name')))
+        out = serializer.serialize(Boat.objects.all())
+        self.assertEqual(len(out), 3)
+        self.assertEqual(out[0]['fields']['title'], boats[0].title.upper())
+        self.assertEqual(
+            out[0]['fields']['pirate']['fields'], dict(
+                name=boats[0].pirate.name))
+
+        compiled = len(PLANS)
+        BaseSerializer(scheme=Scheme(), related=dict(
+            pirate=dict(fields='name'))).serialize(boats)
+        self.assertEqual(len(PLANS), compiled)
+
+    def test_register(self):
+        from adrest.utils.serializer import BaseSerializer
+
+        class Point(object):
+
+            def __init__(self, x, y):
+                self.x, self.y = x, y
+
+        class PointSerializer(BaseSerializer):
+            pass
+
+        PointSerializer.register(
+            Point, lambda p, serializer=None: [p.x, p.y])
+
+        value = dict(point=Point(1, 2), points=[Point(3, 4)])
+        self.assertEqual(PointSerializer().to_simple(value), dict(
+            point=[1, 2], points=[[3, 4]]))
+        self.assertTrue(
+            BaseSerializer().to_simple(value)['point'].startswith('<'))
+
+        # Converters registered for parents later are used too
+        class Size(object):
+
+            def __init__(self, width, height):
+                self.width, self.height = width, height
+
+        class BoxSerializer(PointSerializer):
+            pass
+
+        BoxSerializer.register(Point, lambda p, serializer=None: p.x)
+        PointSerializer.register(Size, lambda s, serializer=None: '%sx%s' % (
+            s.width, s.height))
+        self.assertEqual(BoxSerializer().to_simple(
+            [Point(1, 2), Size(3, 4)]), [1, '3x4'])
+        self.assertEqual(PointSerializer().to_simple(Point(1, 2)), [1, 2])
+
+    def test_json_backends(self):
+        from adrest.utils.jsonlib import get_backend, UJSONBackend
+
+        backend = get_backend('json')
+        self.assertEqual(backend.loads(backend.dumps(
+            dict(a=[1, 2]), sort_keys=True)), dict(a=[1, 2]))
+        self.assertRaises(AssertionError, get_backend, 'unknown')
+
+        backend = UJSONBackend.__new__(UJSONBackend)
+        self.assertEqual(backend.prepare_options(dict(
+            separators=(', ', ': '), indent=2)), dict(indent=2))
+        self.assertRaises(
+            AssertionError, backend.prepare_options, dict(cls=object))
+        self.assertRaises(
+            AssertionError, backend.prepare_options, dict(
+                separators=(';', '=')))
+
+    def test_values(self):
+        from adrest.utils.serializer import BaseSerializer
+        from django.db import connection
+        from tests.core.models import Pirate, Treasure
+
+        mixer.cycle(3).blend('core.pirate', captain=mixer.random)
+        mixer.cycle(3).blend('core.treasure', pirate=mixer.select)
+        mixer.blend('core.treasure', pirate=None)
+
+        for qs in (Pirate.objects.all(), Treasure.objects.all()):
+            for format_ in ('django', 'simple'):
+                serializer = BaseSerializer(format=format_)
+                with self.assertNumQueries(1):
+                    out = serializer.serialize(qs.all())
+                self.assertEqual(out, serializer.serialize(list(qs)))
+
+        serializer = BaseSerializer(fields=('name', 'character'))
+        with self.settings(DEBUG=True):
+            start = len(connection.queries)
+            out = serializer.serialize(Pirate.objects.all())
+            queries = [q['sql'] for q in connection.queries[start:]]
+        self.assertEqual(len(queries), 1)
+        self.assertFalse('captain' in queries[0])
+        self.assertEqual(
+            sorted(out[0]['fields'].keys()), ['character', 'name'])
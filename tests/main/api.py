@@ -1,7 +1,8 @@
 from .resources import (
     AuthorResource, BookPrefixResource, ArticleResource, SomeOtherResource,
-    CustomResource, CSVResource)
+    CustomResource, CSVResource, BookListResource)
 from adrest.api import Api
+from adrest.resources import ExportResource
 from adrest.utils.auth import AnonimousAuthenticator, AccessKeyAuthenticator, \
     UserAuthenticator
 from adrest.utils.emitter import XMLTemplateEmitter, JSONEmitter
@@ -23,5 +24,7 @@ API.register(CustomResource)
 API.register(ArticleResource, authenticators=AccessKeyAuthenticator)
 API.register(SomeOtherResource, url_name='test', url_regex='test/mem/$')
 API.register(CSVResource)
+API.register(BookListResource)
+API.register(ExportResource, export_background=False)
 
 # lint_ignore=C
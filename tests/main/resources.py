@@ -81,6 +81,26 @@ class CustomResource(ResourceView):
                 e)), status=400, emitter=JSONEmitter)
 
 
+class BookListResource(ResourceView):
+
+    """ Books without drafts and prices. """
+
+    class Meta:
+        model = 'main.book'
+        name = 'books'
+        limit_per_page = 0
+
+    def get(self, request, **resources):
+        collection = self.get_collection(request, **resources)
+        return self.paginate(request, collection.exclude(status=3))
+
+    @staticmethod
+    def to_simple(content, simple, serializer=None):
+        for item in simple if isinstance(simple, list) else [simple]:
+            item['fields'].pop('price')
+        return simple
+
+
 class DummyResource(ResourceView):
 
     class Meta:
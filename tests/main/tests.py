@@ -1,3 +1,4 @@
+import os
 import random
 import re
 from decimal import Decimal
@@ -6,7 +7,7 @@ from django.contrib.auth.models import User
 from django.core import mail
 from django.core.urlresolvers import reverse
 from django.http import HttpResponse
-from django.test import TestCase, Client, RequestFactory
+from django.test import TestCase, TransactionTestCase, Client, RequestFactory
 from django.views.generic import View
 from mixer.backend.django import mixer
 
@@ -61,6 +62,7 @@ class MetaTest(TestCase):
             parser.FormParser.media_type: parser.FormParser,
             parser.XMLParser.media_type: parser.XMLParser,
             parser.JSONParser.media_type: parser.JSONParser,
+            parser.NDJSONParser.media_type: parser.NDJSONParser,
         })
         self.assertEqual(
             AuthorResource._meta.default_parser, parser.FormParser)
@@ -401,6 +403,115 @@ class ResourceTest(AdrestTestCase):
         self.assertEquals(response.status_code, 200)
         self.assertFalse(response.has_header("Link"))
 
+    def test_export(self):
+        import json
+        from adrest.utils.export import Export
+
+        headers = dict(HTTP_ACCEPT='application/json')
+        response = self.post_resource('export', json=True, headers=headers,
+                                      data=dict(resource='author-test-book'))
+        self.assertEqual(response.status_code, 400)
+
+        response = self.post_resource('export', json=True, headers=headers,
+                                      data=dict(resource='books', format='x'))
+        self.assertEqual(response.status_code, 400)
+
+        # Collection is taken by GET method
+        response = self.post_resource('export', json=True, headers=headers,
+                                      data=dict(resource='book'))
+        self.assertEqual(response.status_code, 400)
+
+        response = self.post_resource('export', json=True, headers=headers,
+                                      data=dict(resource='books', query=dict(
+                                          status=[2, 3])))
+        self.assertEqual(response.status_code, 202)
+        state = json.loads(response.content)
+        total = Book.objects.filter(status=2).count()
+        self.assertEqual(state['status'], 'done')
+        self.assertEqual(state['total'], total)
+        self.assertEqual(state['count'], total)
+        self.assertFalse('owner' in state)
+
+        response = self.client.get(state['url'], **headers)
+        self.assertEqual(json.loads(response.content)['id'], state['id'])
+
+        response = self.client.get(state['download'])
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = [json.loads(line) for line in ''.join(
+            response.streaming_content).splitlines()]
+        self.assertEqual(
+            [line['pk'] for line in lines],
+            list(Book.objects.filter(status=2).order_by(
+                'pk').values_list('pk', flat=True)))
+        self.assertFalse([line for line in lines
+                          if 'price' in line['fields']])
+
+        # Jobs are available only for their owners
+        response = self.client.get(state['url'], REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 404)
+        response = self.client.get(state['download'], REMOTE_ADDR='10.0.0.1')
+        self.assertEqual(response.status_code, 404)
+
+        response = self.post_resource('export', json=True, headers=headers,
+                                      data=dict(resource='author',
+                                                format='csv'))
+        state = json.loads(response.content)
+        response = self.client.get(state['download'])
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        content = ''.join(response.streaming_content).splitlines()
+        self.assertEqual(content[0], 'id,name,user,active')
+        self.assertEqual(content[1], '1,author0,1,True')
+        self.assertEqual(len(content), Author.objects.count() + 1)
+
+        response = self.client.get(
+            state['url'].replace(state['id'], '0' * 32), **headers)
+        self.assertEqual(response.status_code, 404)
+
+        # Expired jobs
+        job = Export.load(state['id'])
+        job.save(created_at=0)
+        response = self.client.get(state['url'], **headers)
+        self.assertEqual(response.status_code, 404)
+        self.assertTrue(Export.clean() >= 1)
+        self.assertFalse(Export.load(job.id))
+        self.assertFalse(os.path.exists(job.path))
+
+
+class ExportTest(TransactionTestCase):
+
+    def test_jobs(self):
+        import json
+        from adrest.utils.export import Export
+
+        for n in range(25):
+            Author.objects.create(
+                name='author%s' % n,
+                user=User.objects.create(username='user%s' % n))
+        pks = list(Author.objects.order_by('pk').values_list('pk', flat=True))
+        resource = api.resources['author']()
+
+        # Background thread
+        job = Export('csv', resource='author')
+        job.start(resource, Author.objects.all()).join()
+        job = Export.load(job.id)
+        self.assertEqual(job.state['status'], 'done')
+        self.assertEqual(job.state['count'], 25)
+        with open(job.path) as f:
+            rows = f.read().splitlines()
+        self.assertEqual(rows[0], 'id,name,user,active')
+        self.assertEqual([int(r.split(',')[0]) for r in rows[1:]], pks)
+
+        # Pool of processes
+        job = Export('ndjson', resource='author')
+        job.save()
+        job.run(resource, Author.objects.all(), processes=2, chunk=10)
+        job = Export.load(job.id)
+        self.assertEqual(job.state['status'], 'done')
+        self.assertEqual(job.state['count'], 25)
+        with open(job.path) as f:
+            self.assertEqual(
+                [json.loads(line)['pk'] for line in f], pks)
+
 
 class AdrestMapTest(TestCase):
 
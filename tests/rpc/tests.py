@@ -77,6 +77,14 @@ class RPCTestCase(AdrestTestCase):
             ))
         self.assertEqual(response.content, 'answer("Hello test")')
 
+    def test_scheme(self):
+        from adrest.resources.rpc import RPCResource
+
+        resource = RPCResource(scheme='tests.rpc.dummy')
+        self.assertEqual(resource.scheme_name, 'tests.rpc.dummy')
+        self.assertTrue('tests.rpc.dummy.method1' in resource.methods)
+        self.assertEqual(RPCResource.methods, dict())
+
     def test_base(self):
         uri = self.reverse('test')
         self.assertEqual(uri, '/rpc/1.0.0/test/')
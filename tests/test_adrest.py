@@ -1,7 +1,16 @@
 """ Create Django project for testing. """
 
+import atexit
+from os import path as op
+from shutil import rmtree
+from tempfile import mkdtemp
+
 from django.conf import settings
 
+# Database and exported files are shared with threads and processes
+TMP_ROOT = mkdtemp(prefix='adrest-')
+atexit.register(rmtree, TMP_ROOT, True)
+
 # Configure Django
 settings.configure(
     ADMINS=('test', 'test@test.com'),
@@ -12,7 +21,7 @@ settings.configure(
     DATABASES={
         'default': {
             'ENGINE': 'django.db.backends.sqlite3',
-            'NAME': ':memory:',
+            'NAME': op.join(TMP_ROOT, 'test.sqlite'),
             'USER': '',
             'PASSWORD': '',
             'TEST_CHARSET': 'utf8',
@@ -40,6 +49,7 @@ settings.configure(
     ADREST_ALLOW_OPTIONS=True,
     ADREST_MAIL_ERRORS=(500, 400),
     ADREST_AUTO_CREATE_ACCESSKEY=True,
+    ADREST_EXPORT_ROOT=op.join(TMP_ROOT, 'export'),
 )
 
 # Django 1.7